@@ -1,12 +1,22 @@
 from flask import Flask
 from flask_cors import CORS
-from .extensions import jwt
+from werkzeug.middleware.proxy_fix import ProxyFix
+from .extensions import jwt, limiter, compress
+from .extensions.async_runtime import install_async_runtime
+from .extensions.instrumentation import install_instrumentation
+from .extensions.json_provider import AppJSONProvider
 from .routes.user_routes import user_bp
 from .routes.auth_routes import auth_bp
 from .routes.qr_route import qr_bp
+from .routes.metrics_route import metrics_bp
 from .handlers import register_all_handlers
-from .config.mongo_config import db 
+from .commands import register_commands
+from .config.mongo_config import init_mongo
+from .config.mongo_indexes import init_indexes
 from .config.app_config import config_by_name
+from .auth.jwt_auth import init_signing
+from .services.user_service import email_filter
+from .utils.metrics import registry
 import os
 
 def create_app():
@@ -15,23 +25,59 @@ def create_app():
     # Configuraciones de entorno
     env = os.getenv("FLASK_ENV", "development")
     app.config.from_object(config_by_name[env])
-    app.config["JSONIFY_PRETTYPRINT_REGULAR"] = True
+
+    # IP real del cliente detras de proxies de confianza (limites por IP, /metrics)
+    if app.config["PROXY_FIX_X_FOR"] or app.config["PROXY_FIX_X_PROTO"]:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"],
+                                x_proto=app.config["PROXY_FIX_X_PROTO"])
+
+    # Serializacion JSON (compacta en produccion, orjson si esta disponible)
+    app.json = AppJSONProvider(app)
     
+    # MongoDB (el cliente se crea en el primer uso de cada worker)
+    init_mongo(app)
+
+    # Vistas async sobre un event loop compartido por proceso
+    if app.config["SERVING_MODE"] == "async":
+        install_async_runtime(app)
+
+    # Metricas agregadas entre workers (directorio compartido)
+    if app.config["METRICS_MULTIPROC_DIR"]:
+        registry.enable_multiprocess(app.config["METRICS_MULTIPROC_DIR"], app.config["METRICS_FLUSH_SECONDS"])
+
+    # Metricas por peticion (antes del limiter para medir tambien los 429)
+    install_instrumentation(app)
+
     # Extensiones
     CORS(app)
     jwt.init_app(app)
+    init_signing(app, jwt)
+    limiter.init_app(app)
+    compress.init_app(app)
 
     # Blueprints
     app.register_blueprint(user_bp, url_prefix="/users")
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(qr_bp, url_prefix="/qr")
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
     
     # Handlers globales
     register_all_handlers(app)
 
-    # Debugging de rutas registradas
-    print("Rutas registradas:")
-    for rule in app.url_map.iter_rules():   
-        print(rule, rule.methods)
-        
+    # Comandos de la CLI
+    register_commands(app)
+
+    # Indices de MongoDB (en segundo plano por defecto: no retrasan el arranque)
+    init_indexes(app)
+
+    # Filtro de emails para el login (se construye en segundo plano)
+    if app.config["EMAIL_FILTER_ENABLED"]:
+        email_filter.start()
+
+    # Debugging de rutas registradas (solo en modo debug)
+    if app.debug:
+        print("Rutas registradas:")
+        for rule in app.url_map.iter_rules():
+            print(rule, rule.methods)
+
     return app
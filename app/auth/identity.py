@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from flask import g
+
+
+@dataclass(frozen=True)
+class Identity:
+    """
+    Identidad del usuario que ejecuta la operacion. Se construye una sola vez
+    por peticion a partir del JWT (ver app.decorators.auth_decorators) y se pasa
+    a los servicios, que no leen el JWT directamente. Para procesos batch o CLI
+    se crea con Identity.system().
+    """
+    user_id: str
+    role: str
+    claims: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "Identity":
+        return cls(user_id=str(claims.get("sub")), role=claims.get("role", "user"), claims=claims)
+
+    @classmethod
+    def system(cls, role: str = "master", user_id: str = "system") -> "Identity":
+        return cls(user_id=user_id, role=role)
+
+
+def set_current_identity(identity: Identity):
+    g.identity = identity
+
+
+def current_identity() -> Optional[Identity]:
+    """
+    Identidad de la peticion actual (None si la vista no exige token)
+    """
+    return g.get("identity")
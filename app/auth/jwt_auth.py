@@ -1,33 +1,94 @@
-from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
 from flask_jwt_extended.exceptions import JWTDecodeError
+from jwt.exceptions import InvalidSignatureError
+import time
 from datetime import datetime, timedelta
+from app.utils.request_timing import timed
+
+# Claves asimetricas (JWT_KEYS_DIR); None = HS256 con JWT_SECRET_KEY
+key_ring = None
+
+
+def init_signing(app, jwt):
+    """
+    Si JWT_KEYS_DIR esta configurado, firma con la clave activa (RS256 o EdDSA segun
+    su tipo), añade su kid a la cabecera y verifica con la clave publica del kid.
+    Las claves se leen y parsean una sola vez, al crear la app.
+    """
+    global key_ring
+    keys_dir = app.config.get("JWT_KEYS_DIR")
+    if not keys_dir:
+        key_ring = None
+        return
+
+    # cryptography solo se carga si hay firma asimetrica
+    from app.auth.jwt_keys import KeyRing
+
+    key_ring = KeyRing.from_directory(keys_dir, app.config.get("JWT_ACTIVE_KID"))
+    app.config["JWT_ALGORITHM"] = key_ring.algorithm
+    app.config["JWT_DECODE_ALGORITHMS"] = key_ring.algorithms
+
+    @jwt.encode_key_loader
+    def signing_key(identity):
+        return key_ring.signing_key
+
+    @jwt.decode_key_loader
+    def verification_key(jwt_header, jwt_payload):
+        key = key_ring.verification_key(jwt_header.get("kid"))
+        if key is None:
+            raise InvalidSignatureError("Unknown signing key")
+        return key
+
+    @jwt.additional_headers_loader
+    def key_id_header(identity):
+        return {"kid": key_ring.active_kid}
+
+
+def _issued_ms() -> int:
+    """
+    Instante de emision en milisegundos (claim iat_ms). iat tiene resolucion de
+    segundos y no basta para comparar con una revocacion del mismo segundo.
+    """
+    return int(time.time() * 1000)
 
 def generate_token(user_id: str, role: str) -> str:
     """
     Genera un JWT para un usuario con su ID y rol
     """
     identity = str(user_id)
-    additional_claims = {"role": role}
+    additional_claims = {"role": role, "iat_ms": _issued_ms()}
     
-    return create_access_token(
-        identity=identity,
-        additional_claims=additional_claims
-    )
+    with timed("jwt"):
+        return create_access_token(
+            identity=identity,
+            additional_claims=additional_claims
+        )
 
 def generate_temporary_token(user_id: str, role: str, minutes: int = 10) -> str:
     """
     Genera un JWT temporal para un usuario con expiración corta (default: 5 minutos)
     """
     identity = str(user_id)
-    additional_claims = {"role": role}
+    additional_claims = {"role": role, "iat_ms": _issued_ms()}
 
     expires = timedelta(minutes=minutes)
 
-    return create_access_token(
-        identity=identity,
-        additional_claims=additional_claims,
-        expires_delta=expires
-    )
+    with timed("jwt"):
+        return create_access_token(
+            identity=identity,
+            additional_claims=additional_claims,
+            expires_delta=expires
+        )
+
+def generate_refresh_token(user_id: str, family: str, generation: int) -> str:
+    """
+    Genera un refresh token de la familia indicada (ver TokenService)
+    """
+    with timed("jwt"):
+        return create_refresh_token(
+            identity=str(user_id),
+            additional_claims={"fam": family, "gen": generation, "iat_ms": _issued_ms()}
+        )
 
 def verify_token(token: str):
     """
@@ -35,8 +96,13 @@ def verify_token(token: str):
     Devuelve None si el token está expirado o inválido.
     """
     try:
-        decoded = decode_token(token)
+        with timed("jwt"):
+            decoded = decode_token(token)
         
+        # Los refresh tokens solo sirven en /auth/refresh
+        if decoded.get("type") == "refresh":
+            return None
+
         # Verifica expiración
         exp_timestamp = decoded.get("exp")
         if not exp_timestamp or datetime.utcnow().timestamp() > exp_timestamp:
@@ -46,6 +112,9 @@ def verify_token(token: str):
         return {
             "user_id": decoded.get("sub"),
             "role": decoded.get("role"),
+            "iat": decoded.get("iat"),
+            "iat_ms": decoded.get("iat_ms"),
+            "jti": decoded.get("jti"),
             "exp": exp_timestamp
         }
 
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import json
+import os
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _int_b64url(value: int) -> str:
+    return _b64url(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+
+def algorithm_for(key) -> str:
+    """
+    Algoritmo JWT segun el tipo de clave: RSA -> RS256, Ed25519 -> EdDSA
+    """
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    raise ValueError(f"Tipo de clave no soportado: {type(key).__name__}")
+
+
+def public_jwk(kid: str, public_key) -> dict:
+    """
+    Clave publica en formato JWK (RFC 7517 / RFC 8037)
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        return {"kty": "RSA", "kid": kid, "use": "sig", "alg": "RS256",
+                "n": _int_b64url(numbers.n), "e": _int_b64url(numbers.e)}
+    raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    return {"kty": "OKP", "kid": kid, "use": "sig", "alg": "EdDSA", "crv": "Ed25519", "x": _b64url(raw)}
+
+
+class KeyRing:
+    """
+    Claves de firma de JWT cargadas una sola vez desde un directorio:
+    - <kid>.pem con clave privada: puede firmar y verificar.
+    - <kid>.pub.pem con clave publica: solo verifica (claves retiradas en rotacion).
+    La clave activa (active_kid) firma los tokens nuevos; las demas siguen
+    verificando los tokens emitidos antes de la rotacion.
+    """
+
+    def __init__(self, private_keys: dict, public_keys: dict, active_kid: str):
+        if active_kid not in private_keys:
+            raise ValueError(f"No hay clave privada para el kid activo '{active_kid}'")
+        self.active_kid = active_kid
+        self.signing_key = private_keys[active_kid]
+        self.algorithm = algorithm_for(self.signing_key)
+        self.public_keys = dict(public_keys)
+        self.algorithms = sorted({algorithm_for(key) for key in self.public_keys.values()})
+        # JWKS serializado una vez: el endpoint solo devuelve estos bytes
+        self.jwks = json.dumps(
+            {"keys": [public_jwk(kid, key) for kid, key in sorted(self.public_keys.items())]},
+            separators=(",", ":"),
+        ).encode()
+        self.jwks_etag = hashlib.sha256(self.jwks).hexdigest()[:32]
+
+    def verification_key(self, kid: str):
+        """
+        Clave publica del kid; None si no se conoce (el token se rechaza)
+        """
+        return self.public_keys.get(kid)
+
+    @classmethod
+    def from_directory(cls, path: str, active_kid: str = None) -> "KeyRing":
+        private_keys, public_keys = {}, {}
+        for filename in sorted(os.listdir(path)):
+            full_path = os.path.join(path, filename)
+            with open(full_path, "rb") as file:
+                data = file.read()
+            if filename.endswith(".pub.pem"):
+                kid = filename[: -len(".pub.pem")]
+                public_keys[kid] = serialization.load_pem_public_key(data)
+            elif filename.endswith(".pem"):
+                kid = filename[: -len(".pem")]
+                private_keys[kid] = serialization.load_pem_private_key(data, password=None)
+                public_keys[kid] = private_keys[kid].public_key()
+        if not private_keys:
+            raise ValueError(f"No hay claves privadas (.pem) en {path}")
+        if active_kid is None:
+            # Sin kid explicito firma la mas reciente por nombre (p. ej. 2024-06.pem)
+            active_kid = max(private_keys)
+        return cls(private_keys, public_keys, active_kid)
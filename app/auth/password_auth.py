@@ -1,26 +1,215 @@
+import asyncio
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
+from app.config.app_config import Config
+from app.utils.metrics import registry
+from app.utils.request_timing import timed
 
 # Configuracion
 ph = PasswordHasher(
-    time_cost=3,   
-    memory_cost=64 * 1024,
-    parallelism=2,   
-    hash_len=32,    
-    salt_len=16  
+    time_cost=Config.ARGON2_TIME_COST,
+    memory_cost=Config.ARGON2_MEMORY_COST,
+    parallelism=Config.ARGON2_PARALLELISM,
+    hash_len=32,
+    salt_len=16
 )
 
-def hash_password(password: str) -> str:
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+queue_wait_seconds = registry.histogram(
+    "password_hash_queue_wait_seconds",
+    "Tiempo de espera en cola antes de ejecutar Argon2",
+    buckets=HASH_BUCKETS,
+)
+hash_seconds = registry.histogram(
+    "password_hash_duration_seconds",
+    "Duracion de las operaciones Argon2",
+    labelnames=("op",),
+    buckets=HASH_BUCKETS,
+)
+rejected_total = registry.counter(
+    "password_hash_rejected_total",
+    "Operaciones Argon2 rechazadas por saturacion del pool",
+    labelnames=("op",),
+)
+
+
+class PasswordHashBusyError(Exception):
     """
-    Genera un hash Argon2 seguro para la contraseña
+    El pool de Argon2 esta saturado; el cliente debe reintentar mas tarde
     """
-    return ph.hash(password)
 
-def verify_password(hashed_password: str, plain_password: str) -> bool:
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
     """
-    Verifica si la contraseña ingresada coincide con el hash
+    Ejecutor de tamaño fijo para Argon2 con limite de cola.
+    Limita la memoria (memory_cost por hash concurrente) y rechaza
+    de inmediato cuando hay mas de max_workers + max_queue operaciones en curso.
+    Es por proceso y necesita workers con hilos (gthread) o el modo async: en un
+    worker sync run() bloquea el unico hilo, la cola no se llena y el 503 no llega.
     """
+
+    def __init__(self, max_workers: int, max_queue: int, retry_after: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="argon2")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        registry.gauge(
+            "password_hash_in_flight",
+            "Operaciones Argon2 en ejecucion o en cola",
+            func=lambda: self._in_flight,
+        )
+
+    def run(self, op: str, func, *args):
+        """
+        Ejecuta la operacion en el pool y espera su resultado
+        """
+        with timed("hash"):
+            return self.submit(op, func, *args).result()
+
+    def map(self, op: str, func, items) -> list:
+        """
+        Aplica func a cada elemento con como mucho max_workers en curso. Espera turno
+        en lugar de rechazar (lotes) y deja la cola libre para las peticiones.
+        """
+        results, pending = [], deque()
+        for item in items:
+            if len(pending) >= self.max_workers:
+                results.append(pending.popleft().result())
+            pending.append(self.submit(op, func, item, block=True))
+        results.extend(future.result() for future in pending)
+        return results
+
+    def submit(self, op: str, func, *args, block: bool = False):
+        """
+        Encola la operacion en el pool y devuelve el Future; sin hueco rechaza
+        (PasswordHashBusyError) salvo con block=True
+        """
+        if not self._slots.acquire(blocking=block):
+            rejected_total.inc(1, op)
+            raise PasswordHashBusyError(self.retry_after)
+
+        with self._lock:
+            self._in_flight += 1
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            queue_wait_seconds.observe(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                hash_seconds.observe(time.perf_counter() - started, op)
+
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+pool = PasswordHashPool(
+    max_workers=Config.PASSWORD_HASH_WORKERS,
+    max_queue=Config.PASSWORD_HASH_QUEUE,
+    retry_after=Config.PASSWORD_HASH_RETRY_AFTER,
+)
+
+
+_dummy = None
+_dummy_lock = threading.Lock()
+
+
+def _verify(hashed_password: str, plain_password: str) -> bool:
     try:
         return ph.verify(hashed_password, plain_password)
     except VerifyMismatchError:
         return False
+
+def hash_password(password: str) -> str:
+    """
+    Genera un hash Argon2 seguro para la contraseña
+    """
+    return pool.run("hash", ph.hash, password)
+
+def hash_passwords_parallel(passwords: list) -> list:
+    """
+    Genera los hashes de un lote de contraseñas en el pool de Argon2 (libera el GIL,
+    asi que los hilos corren en paralelo). Es el mismo pool que el de las peticiones:
+    el tope de memoria PASSWORD_HASH_WORKERS es comun a ambos.
+    """
+    if not passwords:
+        return []
+    started = time.perf_counter()
+    with timed("hash"):
+        hashes = pool.map("bulk_hash", ph.hash, passwords)
+    hash_seconds.observe((time.perf_counter() - started) / len(passwords), "bulk_hash")
+    return hashes
+
+def submit_hash_password(password: str):
+    """
+    Encola el hash de la contraseña y devuelve un Future (no bloquea la peticion)
+    """
+    return pool.submit("rehash", ph.hash, password)
+
+def verify_password(hashed_password: str, plain_password: str) -> bool:
+    """
+    Verifica si la contraseña ingresada coincide con el hash
+    """
+    return pool.run("verify", _verify, hashed_password, plain_password)
+
+async def verify_password_async(hashed_password: str, plain_password: str) -> bool:
+    """
+    Igual que verify_password pero sin bloquear el event loop (modo async)
+    """
+    with timed("hash"):
+        return await asyncio.wrap_future(pool.submit("verify", _verify, hashed_password, plain_password))
+
+def _dummy_hash_future():
+    """
+    Hash de referencia con los parametros actuales, generado una vez por proceso en el
+    pool (no al arrancar: no retrasa create_app) la primera vez que falta un email
+    """
+    global _dummy
+    with _dummy_lock:
+        if _dummy is None or (_dummy.done() and _dummy.exception() is not None):
+            _dummy = pool.submit("hash", ph.hash, secrets.token_urlsafe(16))
+        return _dummy
+
+def verify_dummy(plain_password: str) -> bool:
+    """
+    Verificacion contra un hash de referencia cuando el email no existe,
+    para que el login tarde lo mismo exista o no el usuario. Siempre False.
+    """
+    verify_password(_dummy_hash_future().result(), plain_password)
+    return False
+
+async def verify_dummy_async(plain_password: str) -> bool:
+    dummy_hash = await asyncio.wrap_future(_dummy_hash_future())
+    await verify_password_async(dummy_hash, plain_password)
+    return False
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Indica si el hash fue generado con parametros distintos a los actuales
+    """
+    return ph.check_needs_rehash(hashed_password)
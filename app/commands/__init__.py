@@ -0,0 +1,15 @@
+from .argon2_commands import calibrate_argon2
+from .replay_commands import replay_guard_server
+from .user_commands import import_users
+from .jwt_commands import generate_jwt_key
+from .mongo_commands import ensure_indexes_command
+
+def register_commands(app):
+    """
+    Registra los comandos de la CLI de Flask
+    """
+    app.cli.add_command(calibrate_argon2)
+    app.cli.add_command(replay_guard_server)
+    app.cli.add_command(import_users)
+    app.cli.add_command(generate_jwt_key)
+    app.cli.add_command(ensure_indexes_command)
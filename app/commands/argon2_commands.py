@@ -0,0 +1,71 @@
+import statistics
+import time
+
+import click
+from argon2 import PasswordHasher
+from app.config.app_config import Config
+
+SAMPLE_PASSWORD = "Calibrate-Argon2!"
+
+
+def measure_verify(time_cost: int, memory_cost: int, parallelism: int, samples: int):
+    """
+    Mide la latencia de verify() para unos parametros. Devuelve (mediana, p95) en ms.
+    """
+    hasher = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=32,
+        salt_len=16,
+    )
+    hashed = hasher.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify(hashed, SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95
+
+
+@click.command("calibrate-argon2")
+@click.option("--target-ms", default=250.0, show_default=True, help="Latencia objetivo de verify (p95).")
+@click.option("--memory-cost", "memory_costs", type=int, multiple=True,
+              help="Memoria en KiB a probar (repetible). Por defecto ARGON2_MEMORY_COST.")
+@click.option("--parallelism", type=int, default=None, help="Hilos de Argon2. Por defecto ARGON2_PARALLELISM.")
+@click.option("--max-time-cost", default=10, show_default=True)
+@click.option("--samples", default=5, show_default=True)
+def calibrate_argon2(target_ms, memory_costs, parallelism, max_time_cost, samples):
+    """
+    Mide Argon2 en este host y propone parametros para la latencia objetivo.
+    """
+    memory_costs = memory_costs or (Config.ARGON2_MEMORY_COST,)
+    parallelism = parallelism or Config.ARGON2_PARALLELISM
+
+    click.echo(f"Objetivo: verify p95 <= {target_ms:.0f} ms (parallelism={parallelism})")
+    click.echo(f"{'memory_kib':>10} {'time_cost':>9} {'median_ms':>10} {'p95_ms':>8}")
+
+    best = None
+    for memory_cost in memory_costs:
+        for time_cost in range(1, max_time_cost + 1):
+            median, p95 = measure_verify(time_cost, memory_cost, parallelism, samples)
+            click.echo(f"{memory_cost:>10} {time_cost:>9} {median:>10.1f} {p95:>8.1f}")
+            if p95 > target_ms:
+                break
+            # Se prefiere mas memoria y luego mas iteraciones dentro del presupuesto
+            if best is None or (memory_cost, time_cost) > (best[0], best[1]):
+                best = (memory_cost, time_cost, p95)
+
+    if best is None:
+        click.echo("Ningun parametro cumple el objetivo; reduce --memory-cost o sube --target-ms.")
+        return
+
+    memory_cost, time_cost, p95 = best
+    click.echo("")
+    click.echo(f"Propuesta (p95 {p95:.1f} ms):")
+    click.echo(f"ARGON2_TIME_COST={time_cost}")
+    click.echo(f"ARGON2_MEMORY_COST={memory_cost}")
+    click.echo(f"ARGON2_PARALLELISM={parallelism}")
+    click.echo("Los hashes existentes se actualizan de forma gradual en el siguiente login.")
@@ -0,0 +1,51 @@
+import os
+from datetime import date
+
+import click
+from app.config.app_config import Config
+
+
+@click.command("generate-jwt-key")
+@click.option("--dir", "keys_dir", default=Config.JWT_KEYS_DIR, required=Config.JWT_KEYS_DIR is None,
+              help="Directorio de claves. Por defecto JWT_KEYS_DIR.")
+@click.option("--kid", default=lambda: date.today().isoformat(), help="Identificador de la clave (fecha por defecto).")
+@click.option("--algorithm", type=click.Choice(["EdDSA", "RS256"]), default="EdDSA", show_default=True)
+@click.option("--retire", "retire_kid", default=None, help="Deja solo la clave publica de este kid.")
+def generate_jwt_key(keys_dir, kid, algorithm, retire_kid):
+    """
+    Crea una clave de firma <kid>.pem para la rotacion de JWT, o retira una existente.
+    Tras crearla, apuntar JWT_ACTIVE_KID al nuevo kid y reiniciar los workers; la
+    clave anterior debe seguir en el directorio hasta que caduquen sus tokens.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    os.makedirs(keys_dir, exist_ok=True)
+
+    if retire_kid:
+        private_path = os.path.join(keys_dir, f"{retire_kid}.pem")
+        with open(private_path, "rb") as file:
+            private_key = serialization.load_pem_private_key(file.read(), password=None)
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        with open(os.path.join(keys_dir, f"{retire_kid}.pub.pem"), "wb") as file:
+            file.write(public_pem)
+        os.remove(private_path)
+        click.echo(f"Clave {retire_kid} retirada: solo verifica")
+        return
+
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    path = os.path.join(keys_dir, f"{kid}.pem")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(private_pem)
+    click.echo(f"Clave {algorithm} creada: {path} (JWT_ACTIVE_KID={kid})")
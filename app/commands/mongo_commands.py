@@ -0,0 +1,13 @@
+import click
+from app.config.mongo_indexes import ensure_indexes
+
+
+@click.command("ensure-indexes")
+def ensure_indexes_command():
+    """
+    Crea los indices de MongoDB (para despliegues con MONGO_ENSURE_INDEXES=off).
+    """
+    failed = ensure_indexes()
+    if failed:
+        raise click.ClickException(f"No se pudieron crear los indices: {', '.join(failed)}")
+    click.echo("Indices de MongoDB verificados")
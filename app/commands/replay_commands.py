@@ -0,0 +1,18 @@
+import click
+from app.config.app_config import Config
+from app.utils.replay_guard import parse_address, require_authkey, serve_replay_store
+
+
+@click.command("replay-guard-server")
+@click.option("--address", default=Config.QR_REPLAY_ADDRESS, show_default=True)
+@click.option("--bucket-seconds", default=60, show_default=True)
+def replay_guard_server(address, bucket_seconds):
+    """
+    Sirve el registro de jti de QR compartido por los workers (QR_REPLAY_BACKEND=manager).
+    """
+    try:
+        authkey = require_authkey(Config.QR_REPLAY_AUTHKEY)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Replay guard escuchando en {address}")
+    serve_replay_store(parse_address(address), authkey, bucket_seconds)
@@ -0,0 +1,22 @@
+import csv
+import json
+
+import click
+from app.auth.identity import Identity
+from app.services.user_service import UserService
+
+
+@click.command("import-users")
+@click.argument("csv_file", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--as-role", default="master", show_default=True,
+              help="Rol con el que se evaluan los permisos de cada fila.")
+@click.option("--report", is_flag=True, help="Muestra el reporte completo por fila.")
+def import_users(csv_file, as_role, report):
+    """
+    Importa usuarios desde un CSV con la misma logica que POST /users/bulk.
+    """
+    identity = Identity.system(role=as_role, user_id="cli")
+    result = UserService.import_users(identity, csv.DictReader(csv_file))
+    click.echo(f"Creados: {result['created']}  Fallidos: {result['failed']}")
+    if report:
+        click.echo(json.dumps(result["results"], indent=2, ensure_ascii=False))
@@ -13,24 +13,191 @@ def parse_timedelta(env_var, default=None):
     except ValueError:
         raise ValueError(f"La variable {env_var} debe ser un entero en segundos o 'none'")
 
+def parse_int(env_var, default):
+    value = os.getenv(env_var, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"La variable {env_var} debe ser un entero")
+
+def parse_bool(env_var, default=False):
+    value = os.getenv(env_var)
+    if value is None:
+        return default
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+def parse_optional_int(env_var, default=None):
+    value = os.getenv(env_var, default)
+    if value is None or str(value).lower() == "none":
+        return None
+    return parse_int(env_var, default)
+
+def parse_float(env_var, default):
+    value = os.getenv(env_var, default)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"La variable {env_var} debe ser un numero")
+
+# Reglas de permisos: accion -> rol actual -> roles objetivo permitidos
+DEFAULT_ROLE_POLICY = {
+    "view": {"master": ["admin"], "admin": ["user"]},
+    "create": {"master": ["admin"], "admin": ["user"]},
+    "update": {"master": ["admin", "master"], "admin": ["user", "admin"]},
+    "delete": {"master": ["admin", "master"], "admin": ["user"]},
+    "assign": {"master": ["admin", "master"], "admin": ["user", "admin"]},
+}
+
 
 class Config:
     FLASK_ENV = os.getenv("FLASK_ENV", "development")
+
+    # "sync" (gunicorn, vistas bloqueantes) o "async" (ASGI: python asgi.py / uvicorn asgi:asgi_app)
+    SERVING_MODE = os.getenv("SERVING_MODE", "sync")
+    ASGI_WSGI_THREADS = parse_int("ASGI_WSGI_THREADS", 32)
     
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default-secret-key")
-    JWT_ACCESS_TOKEN_EXPIRES = parse_timedelta("JWT_ACCESS_TOKEN_EXPIRES", None)
-    JWT_REFRESH_TOKEN_EXPIRES = parse_timedelta("JWT_REFRESH_TOKEN_EXPIRES", None)
+    # Access tokens cortos; se renuevan con POST /auth/refresh (sin Argon2)
+    JWT_ACCESS_TOKEN_EXPIRES = parse_timedelta("JWT_ACCESS_TOKEN_EXPIRES", 15 * 60)
+    JWT_REFRESH_TOKEN_EXPIRES = parse_timedelta("JWT_REFRESH_TOKEN_EXPIRES", 30 * 24 * 3600)
+    # Firma asimetrica: directorio con <kid>.pem (privadas) y <kid>.pub.pem (retiradas).
+    # Sin JWT_KEYS_DIR se firma con HS256 y JWT_SECRET_KEY
+    JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+    JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+    JWT_JWKS_MAX_AGE = parse_int("JWT_JWKS_MAX_AGE", 300)
+    # Cada cuanto trae cada worker las revocaciones (logout, bajas) hechas en otros workers
+    TOKEN_BLOCKLIST_SYNC_SECONDS = parse_int("TOKEN_BLOCKLIST_SYNC_SECONDS", 2)
     
     # MongoDB
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     DB_NAME = os.getenv("DB_NAME", "mydb")
+    MONGO_MAX_POOL_SIZE = parse_int("MONGO_MAX_POOL_SIZE", 100)
+    MONGO_MIN_POOL_SIZE = parse_int("MONGO_MIN_POOL_SIZE", 0)
+    MONGO_MAX_IDLE_TIME_MS = parse_optional_int("MONGO_MAX_IDLE_TIME_MS", None)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = parse_optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", None)
+    MONGO_CONNECT_TIMEOUT_MS = parse_int("MONGO_CONNECT_TIMEOUT_MS", 20000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = parse_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000)
+    MONGO_SOCKET_TIMEOUT_MS = parse_optional_int("MONGO_SOCKET_TIMEOUT_MS", None)
+    MONGO_WRITE_CONCERN = os.getenv("MONGO_WRITE_CONCERN", "1")
+    # Indices al arrancar: startup | background | off (flask ensure-indexes)
+    MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "background")
+    # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    MONGO_LISTING_READ_PREFERENCE = os.getenv("MONGO_LISTING_READ_PREFERENCE", "primary")
+
+    # Politica de roles (JSON con el formato de DEFAULT_ROLE_POLICY); por defecto la incluida
+    ROLE_POLICY_FILE = os.getenv("ROLE_POLICY_FILE")
+
+    # Paginacion de listados
+    USERS_PAGE_DEFAULT_LIMIT = parse_int("USERS_PAGE_DEFAULT_LIMIT", 100)
+    USERS_PAGE_MAX_LIMIT = parse_int("USERS_PAGE_MAX_LIMIT", 1000)
+
+    # Respuestas JSON: "auto" usa orjson si esta instalado; "json" fuerza la stdlib
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+    JSON_PRETTY = parse_bool("JSON_PRETTY", False)
+
+    # Compresion de respuestas (Flask-Compress): listados JSON y el base64 de /qr/generate-qr
+    COMPRESS_ALGORITHM = os.getenv("COMPRESS_ALGORITHM", "br,gzip").split(",")
+    COMPRESS_MIN_SIZE = parse_int("COMPRESS_MIN_SIZE", 1024)
+    COMPRESS_LEVEL = parse_int("COMPRESS_LEVEL", 6)
+    COMPRESS_BR_LEVEL = parse_int("COMPRESS_BR_LEVEL", 4)
+    COMPRESS_MIMETYPES = ["application/json", "image/svg+xml", "text/plain"]
+    # Los listados en streaming (?stream=) no se comprimen: Flask-Compress <1.25 llama
+    # get_data() y bufferiza el cuerpo entero, lo que anula el streaming
+    COMPRESS_STREAMS = parse_bool("COMPRESS_STREAMS", False)
+
+    # Cache de usuarios por _id ({_id, role, email}) en la capa de servicios
+    USER_CACHE_MAXSIZE = parse_int("USER_CACHE_MAXSIZE", 10000)
+    USER_CACHE_TTL = parse_int("USER_CACHE_TTL", 30)
+
+    # Filtro de emails registrados para el login (Bloom). Cada worker tiene su copia y
+    # sondea cada EMAIL_FILTER_POLL_SECONDS si otro worker añadio emails; entonces
+    # consulta MongoDB hasta reconstruirlo (como mucho cada EMAIL_FILTER_REBUILD_SECONDS)
+    EMAIL_FILTER_ENABLED = parse_bool("EMAIL_FILTER_ENABLED", False)
+    EMAIL_FILTER_ERROR_RATE = parse_float("EMAIL_FILTER_ERROR_RATE", 0.01)
+    EMAIL_FILTER_REFRESH_SECONDS = parse_int("EMAIL_FILTER_REFRESH_SECONDS", 60)
+    EMAIL_FILTER_POLL_SECONDS = parse_float("EMAIL_FILTER_POLL_SECONDS", 2)
+    EMAIL_FILTER_REBUILD_SECONDS = parse_float("EMAIL_FILTER_REBUILD_SECONDS", 30)
+
+    # Parametros de Argon2 (calibrar con: flask --app main calibrate-argon2)
+    ARGON2_TIME_COST = parse_int("ARGON2_TIME_COST", 3)
+    ARGON2_MEMORY_COST = parse_int("ARGON2_MEMORY_COST", 64 * 1024)
+    ARGON2_PARALLELISM = parse_int("ARGON2_PARALLELISM", 2)
+
+    # Rate limiting (flask-limiter). memory:// es por proceso; para compartir
+    # los contadores entre workers usar p. ej. redis://localhost:6379
+    RATELIMIT_ENABLED = parse_bool("RATELIMIT_ENABLED", True)
+    RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "moving-window")
+    RATELIMIT_HEADERS_ENABLED = True
+    LOGIN_RATE_LIMIT_IP = os.getenv("LOGIN_RATE_LIMIT_IP", "30/minute")
+    LOGIN_RATE_LIMIT_EMAIL = os.getenv("LOGIN_RATE_LIMIT_EMAIL", "5/minute;20/hour")
+    QR_RATE_LIMIT_DEVICE = os.getenv("QR_RATE_LIMIT_DEVICE", "120/minute")
+    QR_BATCH_RATE_LIMIT_DEVICE = os.getenv("QR_BATCH_RATE_LIMIT_DEVICE", "10/minute")
+    # Por IP: varios lectores pueden compartir salida (NAT), de ahi el margen
+    QR_RATE_LIMIT_IP = os.getenv("QR_RATE_LIMIT_IP", "600/minute")
+    QR_BATCH_RATE_LIMIT_IP = os.getenv("QR_BATCH_RATE_LIMIT_IP", "30/minute")
+
+    # Proxies inversos de confianza delante de la app (nginx, balanceador). Con N > 0
+    # remote_addr sale de X-Forwarded-For (N saltos) y los limites por IP son por cliente;
+    # sin proxy dejarlo a 0 o cualquier cliente podria falsear su IP
+    PROXY_FIX_X_FOR = parse_int("PROXY_FIX_X_FOR", 0)
+    PROXY_FIX_X_PROTO = parse_int("PROXY_FIX_X_PROTO", 0)
+
+    # /metrics: solo desde las redes de METRICS_ALLOWED_IPS (CIDR separados por comas,
+    # por defecto loopback) o con "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_ALLOWED_IPS = [net.strip() for net in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1/32,::1/128").split(",") if net.strip()]
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Con varios workers, directorio compartido donde cada uno vuelca sus metricas para
+    # que /metrics devuelva el agregado (vaciarlo al desplegar). Sin el, son por proceso
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = parse_float("METRICS_FLUSH_SECONDS", 1)
+
+    # Pool de Argon2 por proceso (cada hash concurrente usa ARGON2_MEMORY_COST KiB).
+    # La cola y el 503 solo actuan con workers con hilos (gunicorn -k gthread --threads N)
+    # o en modo async: un worker sync atiende una peticion cada vez y nunca la llena
+    PASSWORD_HASH_WORKERS = parse_int("PASSWORD_HASH_WORKERS", 2)
+    PASSWORD_HASH_QUEUE = parse_int("PASSWORD_HASH_QUEUE", 8)
+    PASSWORD_HASH_RETRY_AFTER = parse_int("PASSWORD_HASH_RETRY_AFTER", 1)
+
+    # Importacion masiva de usuarios
+    BULK_IMPORT_BATCH_SIZE = parse_int("BULK_IMPORT_BATCH_SIZE", 500)
+    BULK_IMPORT_MAX_ROWS = parse_int("BULK_IMPORT_MAX_ROWS", 20000)
+    # POST /users/bulk corre en segundo plano; su reporte se guarda estos segundos
+    BULK_IMPORT_JOB_TTL = parse_int("BULK_IMPORT_JOB_TTL", 24 * 3600)
+
+    # Codigos QR
+    QR_BOX_SIZE = parse_int("QR_BOX_SIZE", 10)
+    # ?raw=1 en PNG: pixeles por modulo. Con 1 el cliente escala la imagen
+    # (CSS image-rendering: pixelated) y se envian ~100 veces menos pixeles
+    QR_RAW_BOX_SIZE = parse_int("QR_RAW_BOX_SIZE", 1)
+    QR_BORDER = parse_int("QR_BORDER", 5)
+    # Mascara: "none" (por defecto) deja que qrcode elija la de menor penalizacion,
+    # que es la que mejor se escanea; fijarla (0-7) evita probar las 8, a costa de eso
+    QR_MASK_PATTERN = parse_optional_int("QR_MASK_PATTERN", None)
+    QR_TOKEN_MINUTES = parse_int("QR_TOKEN_MINUTES", 10)
+
+    # Validacion de QR: "db" consulta MongoDB en cada escaneo,
+    # "stateless" confia en el token firmado y en la cache de usuarios activos
+    QR_VALIDATION_MODE = os.getenv("QR_VALIDATION_MODE", "db")
+    QR_ACTIVE_USERS_TTL = parse_int("QR_ACTIVE_USERS_TTL", 60)
+    QR_ACTIVE_USERS_MAX = parse_int("QR_ACTIVE_USERS_MAX", 100000)
+    QR_BATCH_MAX_TOKENS = parse_int("QR_BATCH_MAX_TOKENS", 5000)
+
+    # QR de un solo uso (jti): "memory" por proceso o "manager" compartido
+    QR_SINGLE_USE = parse_bool("QR_SINGLE_USE", False)
+    QR_REPLAY_BACKEND = os.getenv("QR_REPLAY_BACKEND", "memory")
+    QR_REPLAY_ADDRESS = os.getenv("QR_REPLAY_ADDRESS", "127.0.0.1:50055")
+    # Obligatoria con "manager": el protocolo usa pickle y quien conozca la clave
+    # puede ejecutar codigo en el servidor (p. ej. python -c "import secrets; print(secrets.token_hex(32))")
+    QR_REPLAY_AUTHKEY = os.getenv("QR_REPLAY_AUTHKEY")
 
     DEBUG = False
     TESTING = False
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    JSON_PRETTY = parse_bool("JSON_PRETTY", True)
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -1,5 +1,273 @@
-from pymongo import MongoClient
+import atexit
+import os
+import threading
+import time
+
+from pymongo import MongoClient, ReadPreference
+from pymongo.monitoring import ConnectionPoolListener, CommandListener
 from app.config.app_config import Config
+from app.utils.metrics import registry
+from app.utils.request_timing import record
+
+MONGO_SETTINGS = (
+    "MONGO_URI",
+    "DB_NAME",
+    "MONGO_MAX_POOL_SIZE",
+    "MONGO_MIN_POOL_SIZE",
+    "MONGO_MAX_IDLE_TIME_MS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "MONGO_CONNECT_TIMEOUT_MS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS",
+    "MONGO_SOCKET_TIMEOUT_MS",
+    "MONGO_WRITE_CONCERN",
+    "MONGO_LISTING_READ_PREFERENCE",
+)
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+checkout_wait_seconds = registry.histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Tiempo de espera para obtener una conexion del pool de MongoDB",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+checkout_failed_total = registry.counter(
+    "mongo_pool_checkout_failed_total",
+    "Fallos al obtener una conexion del pool de MongoDB",
+    labelnames=("reason",),
+)
+connections_checked_out = registry.gauge(
+    "mongo_pool_connections_checked_out",
+    "Conexiones de MongoDB en uso",
+)
+command_seconds = registry.histogram(
+    "mongo_command_duration_seconds",
+    "Duracion de los comandos de MongoDB",
+    labelnames=("command",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+class PoolCheckoutListener(ConnectionPoolListener):
+    """
+    Mide la espera de checkout del pool. Los eventos llegan en el hilo que pide la conexion.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            checkout_wait_seconds.observe(time.perf_counter() - started)
+            self._local.started = None
+        connections_checked_out.inc()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        checkout_failed_total.inc(1, str(event.reason))
+
+    def connection_checked_in(self, event):
+        connections_checked_out.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+class CommandTimingListener(CommandListener):
+    """
+    Suma la duracion de cada comando (medida por el driver) al tiempo de "db"
+    de la peticion en curso
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        command_seconds.observe(seconds, event.command_name)
+        record("db", seconds)
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        command_seconds.observe(seconds, event.command_name)
+        record("db", seconds)
+
+
+_settings = {key: getattr(Config, key) for key in MONGO_SETTINGS}
+_client = None
+_client_pid = None
+_async_client = None
+_async_client_pid = None
+_lock = threading.Lock()
+
+
+def init_mongo(app):
+    """
+    Toma la configuracion de MongoDB de la app. El cliente se crea en el primer uso
+    dentro de cada proceso, es decir, despues del fork de gunicorn.
+    """
+    global _client, _async_client
+    _settings.update({key: app.config[key] for key in MONGO_SETTINGS if key in app.config})
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _async_client = None
+
+
+def close_mongo():
+    """
+    Cierra el cliente del proceso actual (registrado con atexit)
+    """
+    global _client
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+
+
+atexit.register(close_mongo)
+
+
+def _client_options() -> dict:
+    write_concern = _settings["MONGO_WRITE_CONCERN"]
+    return dict(
+        maxPoolSize=_settings["MONGO_MAX_POOL_SIZE"],
+        minPoolSize=_settings["MONGO_MIN_POOL_SIZE"],
+        maxIdleTimeMS=_settings["MONGO_MAX_IDLE_TIME_MS"],
+        waitQueueTimeoutMS=_settings["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        connectTimeoutMS=_settings["MONGO_CONNECT_TIMEOUT_MS"],
+        serverSelectionTimeoutMS=_settings["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        socketTimeoutMS=_settings["MONGO_SOCKET_TIMEOUT_MS"],
+        w=int(write_concern) if write_concern.isdigit() else write_concern,
+    )
+
+
+def _create_client() -> MongoClient:
+    return MongoClient(
+        _settings["MONGO_URI"],
+        connect=False,
+        event_listeners=[PoolCheckoutListener(), CommandTimingListener()],
+        **_client_options(),
+    )
+
+
+def get_client() -> MongoClient:
+    """
+    Cliente de MongoDB del proceso actual. Si el proceso es un fork,
+    se crea uno nuevo en lugar de reutilizar los sockets del padre.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = _create_client()
+                _client_pid = pid
+    return _client
+
+
+def get_db():
+    return get_client()[_settings["DB_NAME"]]
+
+
+def get_async_client():
+    """
+    Cliente async de PyMongo (modo async). Se usa solo desde el loop de
+    app.extensions.async_runtime, que es unico por proceso.
+    """
+    global _async_client, _async_client_pid
+    pid = os.getpid()
+    if _async_client is None or _async_client_pid != pid:
+        with _lock:
+            if _async_client is None or _async_client_pid != pid:
+                from pymongo import AsyncMongoClient
+
+                # Sin PoolCheckoutListener: los eventos de todas las corrutinas llegan
+                # al mismo hilo y la medicion por hilo no seria valida
+                _async_client = AsyncMongoClient(
+                    _settings["MONGO_URI"],
+                    event_listeners=[CommandTimingListener()],
+                    **_client_options(),
+                )
+                _async_client_pid = pid
+    return _async_client
+
+
+class LazyCollection:
+    """
+    Referencia a una coleccion que se resuelve contra el cliente del proceso actual.
+    Con secondary_reads usa MONGO_LISTING_READ_PREFERENCE (listados).
+    """
+
+    def __init__(self, name: str, secondary_reads: bool = False, client_factory=get_client):
+        self.name = name
+        self.secondary_reads = secondary_reads
+        self._client_factory = client_factory
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        client = self._client_factory()
+        if self._client is not client:
+            database = client[_settings["DB_NAME"]]
+            if self.secondary_reads:
+                read_preference = READ_PREFERENCES[_settings["MONGO_LISTING_READ_PREFERENCE"]]
+                self._collection = database.get_collection(self.name, read_preference=read_preference)
+            else:
+                self._collection = database[self.name]
+            self._client = client
+        return self._collection
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+
+class LazyDatabase:
+    """
+    Sustituto de la base de datos a nivel de modulo: db["users"] no abre conexiones
+    """
+
+    def __init__(self, client_factory=get_client):
+        self._client_factory = client_factory
+
+    def __getitem__(self, name: str) -> LazyCollection:
+        return LazyCollection(name, client_factory=self._client_factory)
+
+    def collection(self, name: str, secondary_reads: bool = False) -> LazyCollection:
+        return LazyCollection(name, secondary_reads, self._client_factory)
+
+    def __getattr__(self, item):
+        return getattr(self._client_factory()[_settings["DB_NAME"]], item)
+
 
-client = MongoClient(Config.MONGO_URI)
-db = client[Config.DB_NAME]
+db = LazyDatabase()
+# Misma interfaz sobre AsyncMongoClient (find_one, to_list, etc. son corrutinas)
+async_db = LazyDatabase(get_async_client)
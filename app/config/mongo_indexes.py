@@ -0,0 +1,53 @@
+import logging
+import threading
+
+from pymongo import ASCENDING
+from app.config.mongo_config import db
+
+logger = logging.getLogger(__name__)
+
+
+# (coleccion, claves, opciones de create_index)
+INDEXES = (
+    ("users", [("email", ASCENDING)], {"name": "email_1", "unique": True}),
+    ("users", [("role", ASCENDING)], {"name": "role_1"}),
+    # Revocaciones de tokens: sincronizacion incremental y borrado al caducar
+    ("token_revocations", [("created_at", ASCENDING)], {"name": "created_at_1"}),
+    ("token_revocations", [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    # Familias de refresh tokens: se borran al caducar su ultimo token
+    ("refresh_families", [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    # Importaciones en segundo plano: el reporte se borra al caducar
+    ("import_jobs", [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+)
+
+
+def ensure_indexes() -> list:
+    """
+    Crea los indices de usuarios, revocaciones, familias de refresh tokens e importaciones.
+    create_index es idempotente, por lo que se puede llamar en cada arranque.
+    Cada indice se intenta por separado (un fallo no impide crear los demas);
+    devuelve los que fallaron como "coleccion.nombre".
+    """
+    failed = []
+    for collection, keys, options in INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+        except Exception as e:
+            failed.append(f"{collection}.{options['name']}")
+            logger.error(f"Error creating MongoDB index {collection}.{options['name']}: {e}", exc_info=True)
+    return failed
+
+
+def init_indexes(app):
+    """
+    Creacion de indices al arrancar segun MONGO_ENSURE_INDEXES:
+    "startup" (bloquea el arranque), "background" (hilo aparte) u "off"
+    (se crean con `flask ensure-indexes` en el despliegue).
+    """
+    mode = app.config["MONGO_ENSURE_INDEXES"]
+    if mode == "startup":
+        ensure_indexes()
+    elif mode == "background":
+        threading.Thread(target=ensure_indexes, name="mongo-indexes", daemon=True).start()
+    elif mode != "off":
+        raise ValueError("MONGO_ENSURE_INDEXES debe ser startup, background u off")
@@ -1,5 +1,8 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt
 from app.services.user_service import UserService
+from app.services.token_service import TokenService
+from app.auth import jwt_auth
 
 service = UserService()
 
@@ -13,3 +16,37 @@ class AuthController:
         response, status = service.login_user(email, password)
         return jsonify(response), status
 
+
+    @staticmethod
+    async def login_user_async():
+        data = request.get_json()
+        email = data.get("email")
+        password = data.get("password")
+        response, status = await service.login_user_async(email, password)
+        return jsonify(response), status
+
+
+    @staticmethod
+    def refresh_token():
+        response, status = TokenService.refresh(get_jwt())
+        return jsonify(response), status
+
+    @staticmethod
+    def logout():
+        data = request.get_json(silent=True) or {}
+        response, status = TokenService.logout(get_jwt(), data.get("refresh_token"))
+        return jsonify(response), status
+
+    @staticmethod
+    def jwks():
+        """
+        Claves publicas de firma (JWKS) para verificar tokens fuera del backend
+        """
+        key_ring = jwt_auth.key_ring
+        if key_ring is None:
+            return jsonify({"error": "Asymmetric signing is not enabled"}), 404
+        response = current_app.response_class(key_ring.jwks, mimetype="application/jwk-set+json")
+        response.set_etag(key_ring.jwks_etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["JWT_JWKS_MAX_AGE"]
+        return response.make_conditional(request)
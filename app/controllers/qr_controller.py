@@ -1,23 +1,63 @@
-from flask import request, jsonify
-from flask_jwt_extended import get_jwt_identity, get_jwt
+from flask import request, jsonify, Response, current_app
+from app.auth.identity import current_identity
 from app.services.qr_service import QRService
+from app.utils.qr_utils import QR_FORMATS
 
 service = QRService()
 
+
+def _raw_box_size(fmt: str):
+    # El SVG es vectorial: su tamaño no depende de los pixeles por modulo
+    return current_app.config["QR_RAW_BOX_SIZE"] if fmt == "png" else None
+
+
 class QRController:
 
     @staticmethod
     def generate_qr():
         """
-        Genera un QR con un token temporal para el usuario actual
+        Genera un QR con un token temporal para el usuario actual.
+        ?format=png|svg elige el formato y ?raw=1 devuelve la imagen sin base64
+        (en PNG, a QR_RAW_BOX_SIZE pixeles por modulo: la escala el cliente).
         """
-        user_id = get_jwt_identity()
-        claims = get_jwt()
-        role = claims.get("role", "user")
+        identity = current_identity()
+
+        fmt = request.args.get("format", "png")
+        if fmt not in QR_FORMATS:
+            return jsonify({"error": "Invalid QR format"}), 400
+
+        if request.args.get("raw") in ("1", "true"):
+            token, image, mimetype = service.generate_qr_image(identity, fmt, _raw_box_size(fmt))
+            return QRController._raw_response(token, image, mimetype)
 
-        qr_data = service.generate_qr_for_user(user_id)
+        qr_data = service.generate_qr_for_user(identity, fmt)
         return jsonify(qr_data), 200
 
+    @staticmethod
+    async def generate_qr_async():
+        """
+        Version async de generate_qr
+        """
+        identity = current_identity()
+
+        fmt = request.args.get("format", "png")
+        if fmt not in QR_FORMATS:
+            return jsonify({"error": "Invalid QR format"}), 400
+
+        if request.args.get("raw") in ("1", "true"):
+            token, image, mimetype = await service.generate_qr_image_async(identity, fmt, _raw_box_size(fmt))
+            return QRController._raw_response(token, image, mimetype)
+
+        qr_data = await service.generate_qr_for_user_async(identity, fmt)
+        return jsonify(qr_data), 200
+
+    @staticmethod
+    def _raw_response(token, image, mimetype):
+        response = Response(image, mimetype=mimetype)
+        response.headers["X-QR-Token"] = token
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
     @staticmethod
     def validate_qr():
         """
@@ -34,3 +74,34 @@ class QRController:
             return jsonify({"error": "Invalid or expired QR token"}), 401
 
         return jsonify(result), 200
+
+    @staticmethod
+    async def validate_qr_async():
+        """
+        Version async de validate_qr
+        """
+        data = request.get_json()
+        token = data.get("token")
+        if not token:
+            return jsonify({"error": "No token provided"}), 400
+
+        result = await service.validate_qr_async(token)
+        if not result:
+            return jsonify({"error": "Invalid or expired QR token"}), 401
+
+        return jsonify(result), 200
+
+    @staticmethod
+    def validate_qr_batch():
+        """
+        Valida en bloque los QR acumulados por un lector sin conexion
+        """
+        data = request.get_json(silent=True) or {}
+        tokens = data.get("tokens")
+        if not isinstance(tokens, list) or not tokens:
+            return jsonify({"error": "No tokens provided"}), 400
+        if len(tokens) > current_app.config["QR_BATCH_MAX_TOKENS"]:
+            return jsonify({"error": "Too many tokens"}), 413
+
+        results = service.validate_qr_batch(tokens)
+        return jsonify({"results": results}), 200
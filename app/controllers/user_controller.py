@@ -1,33 +1,191 @@
-from flask import request, jsonify
+import csv
+import io
+from hashlib import blake2b
+
+from flask import request, jsonify, current_app
 from app.services.user_service import UserService
+from app.services.import_job_service import ImportJobService
+from app.utils.stream_utils import STREAM_FORMATS, stream_response
 
 service = UserService()
 
+
+def _listing_params():
+    """
+    Lee ?after=<id>&limit=N&stream=ndjson|json del query string.
+    Devuelve (params, error).
+    """
+    after = request.args.get("after")
+    stream_format = request.args.get("stream")
+    raw_limit = request.args.get("limit")
+
+    if stream_format is not None and stream_format not in STREAM_FORMATS:
+        return None, "Invalid stream format"
+
+    limit = None
+    if raw_limit is not None:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            return None, "Invalid limit"
+        if limit < 1:
+            return None, "Invalid limit"
+        limit = min(limit, current_app.config["USERS_PAGE_MAX_LIMIT"])
+
+    return {"after": after, "limit": limit, "stream": stream_format}, None
+
+
+def _listing_etag(version: int, scope: str) -> str:
+    """
+    ETag de un listado: version de la coleccion + quien lo pide (el rol decide que
+    usuarios ve) + parametros de la peticion
+    """
+    digest = blake2b(f"{scope}?{request.query_string.decode()}".encode(), digest_size=8).hexdigest()
+    return f"users-{version}-{digest}"
+
+
+def _not_modified(etag: str):
+    """
+    Respuesta 304 si el cliente ya tiene esta version del listado, o None
+    """
+    if request.if_none_match.contains_weak(etag):
+        return _tag(current_app.response_class(status=304), etag)
+    return None
+
+
+def _tag(response, etag: str):
+    # Debil: el cuerpo puede ir comprimido o no con el mismo ETag
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response
+
+
+def _listing_response(params, iter_users, get_page, get_list):
+    if params["stream"]:
+        return stream_response(iter_users(params["after"]), params["stream"], current_app.json.dumps)
+
+    if params["after"] is not None or params["limit"] is not None:
+        limit = params["limit"] or current_app.config["USERS_PAGE_DEFAULT_LIMIT"]
+        users, next_cursor = get_page(params["after"], limit)
+        return jsonify({"users": users, "next": next_cursor})
+
+    return jsonify(get_list())
+
+
+def _conditional_listing(version, scope: str, *args):
+    """
+    Listado con GET condicional: la version se lee antes que los datos, de modo que
+    una escritura concurrente solo puede provocar una descarga de mas. Version y datos
+    salen del primario; con version None (lecturas en secundarios) no hay ETag.
+    """
+    if version is None:
+        return _listing_response(*args)
+    etag = _listing_etag(version, scope)
+    not_modified = _not_modified(etag)
+    if not_modified is not None:
+        return not_modified
+    return _tag(_listing_response(*args), etag)
+
+
+def _import_rows():
+    """
+    Filas a importar: array JSON, cuerpo text/csv o archivo CSV en multipart (campo "file").
+    Los CSV se leen linea a linea desde el stream. Devuelve (rows, error).
+    """
+    if request.mimetype == "application/json":
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return None, "Expected a JSON array of users"
+        return data, None
+
+    if request.mimetype == "text/csv":
+        stream = request.stream
+    elif "file" in request.files:
+        stream = request.files["file"].stream
+    else:
+        return None, "Expected a JSON array or a CSV file"
+
+    return csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")), None
+
+
 class UserController:
 
     @staticmethod
     def get_all_users():
-        return jsonify(service.get_all_users())
+        params, error = _listing_params()
+        if error:
+            return jsonify({"error": error}), 400
+        return _conditional_listing(
+            service.get_users_version(),
+            "all",
+            params,
+            service.iter_all_users,
+            service.get_all_users_page,
+            service.get_all_users,
+        )
+
+    @staticmethod
+    def get_users(identity):
+        params, error = _listing_params()
+        if error:
+            return jsonify({"error": error}), 400
+        return _conditional_listing(
+            service.get_users_version(),
+            identity.role,
+            params,
+            lambda after: service.iter_users(identity, after),
+            lambda after, limit: service.get_users_page(identity, after, limit),
+            lambda: service.get_users(identity),
+        )
 
     @staticmethod
-    def get_users(user_id, role):
-        return jsonify(service.get_users())
+    async def get_users_async(identity):
+        params, error = _listing_params()
+        if error:
+            return jsonify({"error": error}), 400
+        version = await service.get_users_version_async()
+        etag = _listing_etag(version, identity.role) if version is not None else None
+        not_modified = _not_modified(etag) if etag else None
+        if not_modified is not None:
+            return not_modified
+
+        if params["stream"]:
+            response = stream_response(service.iter_users(identity, params["after"]), params["stream"], current_app.json.dumps)
+        elif params["after"] is not None or params["limit"] is not None:
+            limit = params["limit"] or current_app.config["USERS_PAGE_DEFAULT_LIMIT"]
+            users, next_cursor = await service.get_users_page_async(identity, params["after"], limit)
+            response = jsonify({"users": users, "next": next_cursor})
+        else:
+            response = jsonify(await service.get_users_async(identity))
+        return _tag(response, etag) if etag else response
 
     @staticmethod
-    def add_user(user_id, role):
+    def add_user(identity):
         data = request.get_json()
-        response, status = service.add_user(role, data)
+        response, status = service.add_user(identity, data)
+        return jsonify(response), status
+
+    @staticmethod
+    def import_users(identity):
+        rows, error = _import_rows()
+        if error:
+            return jsonify({"error": error}), 400
+        response, status = ImportJobService.start_import(identity, rows)
+        return jsonify(response), status
+
+    @staticmethod
+    def get_import(identity, job_id):
+        response, status = ImportJobService.get_import(identity, job_id)
         return jsonify(response), status
 
     @staticmethod
-    def update_user(user_id, role, target_id):
+    def update_user(identity, target_id):
         data = request.get_json()
-        identity = {"role": role, "id": user_id}
         response, status = service.update_user(identity, target_id, data)
         return jsonify(response), status
 
     @staticmethod
-    def delete_user(user_id, role, target_id):
-        identity = {"role": role, "id": user_id}
+    def delete_user(identity, target_id):
         response, status = service.delete_user(identity, target_id)
         return jsonify(response), status
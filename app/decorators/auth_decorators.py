@@ -1,34 +1,93 @@
-from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+import hmac
+from functools import lru_cache, wraps
+from inspect import iscoroutinefunction
+from ipaddress import ip_address, ip_network
+from flask import current_app, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request
+from app.auth.identity import Identity, current_identity, set_current_identity
+
+def _load_identity():
+    """
+    Verifica el JWT una sola vez y guarda la identidad de la peticion en g
+    """
+    try:
+        _, claims = verify_jwt_in_request()
+    except Exception as e:
+        return jsonify({"error": "Token inválido o ausente", "msg": str(e)}), 401
+    set_current_identity(Identity.from_claims(claims))
+    return None
 
 def token_required(func):
     """
     Decorador que exige un JWT valido en la peticion
     """
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            error = _load_identity()
+            if error:
+                return error
+            return await func(*args, **kwargs)
+        return async_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        try:
-            verify_jwt_in_request()
-        except Exception as e:
-            return jsonify({"error": "Token inválido o ausente", "msg": str(e)}), 401
+        error = _load_identity()
+        if error:
+            return error
         return func(*args, **kwargs)
     return wrapper
 
 def role_required(allowed_roles: list):
     """
-    Decorador que exige un rol valido en el JWT
+    Decorador que exige un rol valido en el JWT.
+    Pasa la identidad de la peticion a la vista como identity=.
     """
     def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                identity = current_identity()
+                if identity is None or identity.role not in allowed_roles:
+                    return jsonify({"error": "Unauthorized"}), 403
+                return await func(*args, identity=identity, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            user_id = get_jwt_identity()
-            claims = get_jwt()
-            role = claims.get("role", "user")
-
-            if role not in allowed_roles:
+            identity = current_identity()
+            if identity is None or identity.role not in allowed_roles:
                 return jsonify({"error": "Unauthorized"}), 403
 
-            return func(*args, user_id=user_id, role=role, **kwargs)
+            return func(*args, identity=identity, **kwargs)
         return wrapper
     return decorator
+
+@lru_cache(maxsize=8)
+def _networks(cidrs: tuple) -> tuple:
+    return tuple(ip_network(cidr, strict=False) for cidr in cidrs)
+
+def _metrics_allowed() -> bool:
+    token = current_app.config["METRICS_TOKEN"]
+    if token:
+        provided = request.headers.get("Authorization", "").encode()
+        if hmac.compare_digest(provided, f"Bearer {token}".encode()):
+            return True
+    try:
+        address = ip_address(request.remote_addr)
+    except ValueError:
+        return False
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return any(address in network for network in _networks(tuple(current_app.config["METRICS_ALLOWED_IPS"])))
+
+def metrics_access_required(func):
+    """
+    Decorador para /metrics: IP en METRICS_ALLOWED_IPS o token METRICS_TOKEN
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _metrics_allowed():
+            return jsonify({"error": "Unauthorized"}), 403
+        return func(*args, **kwargs)
+    return wrapper
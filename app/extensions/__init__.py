@@ -1,5 +1,12 @@
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from flask_compress import Compress
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 
 jwt = JWTManager()
 cors = CORS()
+# Backend segun RATELIMIT_STORAGE_URI: memory:// (por proceso) o redis://, memcached://... (compartido)
+limiter = Limiter(key_func=get_remote_address)
+# Compresion br/gzip de respuestas (COMPRESS_* en la configuracion)
+compress = Compress()
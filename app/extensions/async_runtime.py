@@ -0,0 +1,69 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+
+
+class BackgroundLoop:
+    """
+    Event loop persistente en un hilo propio. Las vistas async de Flask se
+    ejecutan aqui, de modo que el cliente async de MongoDB vive en un solo loop
+    y las esperas de E/S de todas las peticiones se multiplexan.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True)
+                    thread.start()
+                    self._loop = loop
+                    self._pid = os.getpid()
+        return self._loop
+
+    def run(self, coro, context: contextvars.Context = None):
+        """
+        Ejecuta la corrutina en el loop y bloquea el hilo llamante hasta su resultado.
+        El contexto (peticion y app de Flask) se propaga a la tarea. El hilo de
+        a2wsgi queda ocupado mientras tanto (ver las limitaciones en asgi.py).
+        """
+        loop = self.loop()
+        result = concurrent.futures.Future()
+
+        def start():
+            task = loop.create_task(coro, context=context)
+
+            def done(finished):
+                if finished.cancelled():
+                    result.cancel()
+                elif finished.exception() is not None:
+                    result.set_exception(finished.exception())
+                else:
+                    result.set_result(finished.result())
+
+            task.add_done_callback(done)
+
+        loop.call_soon_threadsafe(start)
+        return result.result()
+
+
+background_loop = BackgroundLoop()
+
+
+def install_async_runtime(app):
+    """
+    Reemplaza el puente async->sync de Flask (asgiref) por el loop compartido
+    """
+    def async_to_sync(func):
+        def wrapper(*args, **kwargs):
+            return background_loop.run(func(*args, **kwargs), contextvars.copy_context())
+        return wrapper
+
+    app.async_to_sync = async_to_sync
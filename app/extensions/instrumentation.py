@@ -0,0 +1,47 @@
+import time
+
+from flask import request
+
+from app.utils.metrics import registry
+from app.utils.request_timing import start_request, finish_request
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMPONENT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+request_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "Duracion de las peticiones por endpoint",
+    labelnames=("endpoint", "method", "status"),
+    buckets=REQUEST_BUCKETS,
+)
+component_seconds = registry.histogram(
+    "http_request_component_seconds",
+    "Tiempo de cada peticion por componente (db, hash, jwt, qr_render, serialization)",
+    labelnames=("endpoint", "component"),
+    buckets=COMPONENT_BUCKETS,
+)
+
+
+def install_instrumentation(app):
+    """
+    Registra la medicion por peticion: duracion total por endpoint y desglose por
+    componente. Los componentes se anotan con app.utils.request_timing desde
+    MongoDB (CommandListener), Argon2, JWT, QR y el proveedor JSON.
+    """
+    @app.before_request
+    def start_timer():
+        request.environ["app.request_started"] = time.perf_counter()
+        registry.ensure_flusher()
+        start_request()
+
+    @app.after_request
+    def observe_request(response):
+        started = request.environ.get("app.request_started")
+        breakdown = finish_request()
+        if started is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        request_seconds.observe(time.perf_counter() - started, endpoint, request.method, str(response.status_code))
+        for component, seconds in breakdown.items():
+            component_seconds.observe(seconds, endpoint, component)
+        return response
@@ -0,0 +1,94 @@
+import dataclasses
+import decimal
+import json
+import time
+import uuid
+from datetime import date, datetime
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.request_timing import record
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+JSON_ENCODERS = ("auto", "orjson", "json")
+
+
+def _default(obj):
+    """
+    Tipos que no son JSON nativo: BSON (ObjectId), fechas en ISO 8601 y los que
+    ya soportaba el proveedor de Flask
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de la app:
+    - JSON_PRETTY: indentado (desarrollo) o separadores compactos (produccion).
+    - JSON_ENCODER: "orjson" si esta instalado ("auto"), o "json" de la stdlib.
+    - Serializa ObjectId y datetime de los documentos de MongoDB.
+    El tiempo de dumps cuenta como "serialization" en las metricas por peticion.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        encoder = app.config.get("JSON_ENCODER", "auto")
+        if encoder not in JSON_ENCODERS:
+            raise ValueError(f"JSON_ENCODER debe ser uno de {JSON_ENCODERS}")
+        if encoder == "orjson" and orjson is None:
+            raise RuntimeError("JSON_ENCODER=orjson requiere el paquete orjson")
+        self.pretty = app.config.get("JSON_PRETTY", False)
+        self.use_orjson = orjson is not None and encoder != "json"
+        self.sort_keys = self.pretty
+        if self.use_orjson:
+            self._orjson_options = orjson.OPT_NON_STR_KEYS
+            if self.pretty:
+                self._orjson_options |= orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+        self._json_options = (
+            {"indent": 2, "sort_keys": True, "ensure_ascii": False}
+            if self.pretty
+            else {"separators": (",", ":"), "ensure_ascii": False}
+        )
+
+    def _encode(self, obj) -> bytes:
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_default, option=self._orjson_options)
+        return json.dumps(obj, default=_default, **self._json_options).encode()
+
+    def dumps(self, obj, **kwargs) -> str:
+        started = time.perf_counter()
+        try:
+            if kwargs:
+                kwargs.setdefault("default", _default)
+                return json.dumps(obj, **kwargs)
+            if self.use_orjson:
+                return orjson.dumps(obj, default=_default, option=self._orjson_options).decode()
+            return json.dumps(obj, default=_default, **self._json_options)
+        finally:
+            record("serialization", time.perf_counter() - started)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        started = time.perf_counter()
+        body = self._encode(obj)
+        record("serialization", time.perf_counter() - started)
+        if self.pretty:
+            body += b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
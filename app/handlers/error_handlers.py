@@ -1,4 +1,5 @@
 from flask import jsonify
+from app.auth.password_auth import PasswordHashBusyError
 
 def register_error_handlers(app):
     """
@@ -8,6 +9,17 @@ def register_error_handlers(app):
     def not_found(error):
         return jsonify({"error": "Resource not found"}), 404
 
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        # flask-limiter añade Retry-After y X-RateLimit-* en la respuesta
+        return jsonify({"error": "Too many requests"}), 429
+
     @app.errorhandler(500)
     def internal_error(error):
         return jsonify({"error": "Internal server error"}), 500
+
+    @app.errorhandler(PasswordHashBusyError)
+    def password_hash_busy(error):
+        response = jsonify({"error": "Service busy, try again later"})
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 503
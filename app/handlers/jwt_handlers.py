@@ -1,5 +1,6 @@
 from flask import jsonify
 from app.extensions import jwt
+from app.services.token_blocklist import token_blocklist
 
 def register_jwt_handlers(app):
     """
@@ -17,6 +18,11 @@ def register_jwt_handlers(app):
     def expired_token_response(jwt_header, jwt_payload):
         return jsonify({"error": "Token has expired"}), 401
 
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        # Solo memoria del proceso: sin consultas a MongoDB por peticion
+        return token_blocklist.is_revoked(jwt_payload)
+
     @jwt.revoked_token_loader
     def revoked_token_response(jwt_header, jwt_payload):
         return jsonify({"error": "Token has been revoked"}), 401
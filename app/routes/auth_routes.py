@@ -1,5 +1,25 @@
 from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from app.config.app_config import Config
 from app.controllers.auth_controller import AuthController
+from app.utils.rate_limit_utils import limit_login
+
+ASYNC_MODE = Config.SERVING_MODE == "async"
 
 auth_bp = Blueprint("auth", __name__)
-auth_bp.route("/login", methods=["POST"])(AuthController.login_user)
+auth_bp.route("/login", methods=["POST"])(
+    limit_login(AuthController.login_user_async if ASYNC_MODE else AuthController.login_user)
+)
+
+# POST /auth/refresh -> Nuevo access token (Authorization: Bearer <refresh_token>)
+auth_bp.route("/refresh", methods=["POST"])(
+    jwt_required(refresh=True)(AuthController.refresh_token)
+)
+
+# POST /auth/logout -> Revoca el access token (y la familia del refresh_token enviado)
+auth_bp.route("/logout", methods=["POST"])(
+    jwt_required()(AuthController.logout)
+)
+
+# GET /auth/jwks.json -> Claves publicas para verificar tokens (p. ej. QR en los lectores)
+auth_bp.route("/jwks.json", methods=["GET"])(AuthController.jwks)
@@ -0,0 +1,11 @@
+from flask import Blueprint, Response
+from app.decorators.auth_decorators import metrics_access_required
+from app.utils.metrics import registry
+
+metrics_bp = Blueprint("metrics", __name__)
+
+# GET /metrics -> Metricas en formato Prometheus, de todos los workers con METRICS_MULTIPROC_DIR (red interna o token)
+@metrics_bp.route("", methods=["GET"])
+@metrics_access_required
+def metrics():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
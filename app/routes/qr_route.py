@@ -1,11 +1,24 @@
 from flask import Blueprint
+from app.config.app_config import Config
 from app.controllers.qr_controller import QRController
 from app.decorators.auth_decorators import token_required
+from app.utils.rate_limit_utils import limit_qr
+
+ASYNC_MODE = Config.SERVING_MODE == "async"
 
 qr_bp = Blueprint("qr", __name__)
 
 # Generar QR (solo usuarios autenticados)
-qr_bp.route("/generate-qr", methods=["GET"])(token_required(QRController.generate_qr))
+qr_bp.route("/generate-qr", methods=["GET"])(
+    token_required(QRController.generate_qr_async if ASYNC_MODE else QRController.generate_qr)
+)
 
 # Validar QR (no necesita token, porque el QR ya contiene el JWT temporal)
-qr_bp.route("/validate", methods=["POST"])(QRController.validate_qr)
+qr_bp.route("/validate", methods=["POST"])(
+    limit_qr(QRController.validate_qr_async if ASYNC_MODE else QRController.validate_qr)
+)
+
+# Validar QR en bloque (lectores que reenvian escaneos acumulados sin conexion)
+qr_bp.route("/validate-batch", methods=["POST"])(
+    limit_qr(QRController.validate_qr_batch, "QR_BATCH")
+)
@@ -1,7 +1,10 @@
 from flask import Blueprint
+from app.config.app_config import Config
 from app.controllers.user_controller import UserController
 from app.decorators.auth_decorators import token_required, role_required
 
+ASYNC_MODE = Config.SERVING_MODE == "async"
+
 user_bp = Blueprint("users", __name__)
 
 # ----- SOLO PRUEBAS -----
@@ -9,7 +12,9 @@ user_bp.route("/all-users", methods=["GET"])(UserController.get_all_users)
 
 # GET /users -> Obtener usuarios segun rol
 user_bp.route("/", methods=["GET"])(
-    token_required(role_required(["admin", "master"])(UserController.get_users))
+    token_required(role_required(["admin", "master"])(
+        UserController.get_users_async if ASYNC_MODE else UserController.get_users
+    ))
 )
 
 # POST /users -> Crear nuevo usuario
@@ -17,6 +22,16 @@ user_bp.route("/", methods=["POST"])(
     token_required(role_required(["admin", "master"])(UserController.add_user))
 )
 
+# POST /users/bulk -> Importacion masiva (JSON o CSV) en segundo plano: 202 con job_id
+user_bp.route("/bulk", methods=["POST"])(
+    token_required(role_required(["admin", "master"])(UserController.import_users))
+)
+
+# GET /users/bulk/<job_id> -> Estado y reporte de una importacion
+user_bp.route("/bulk/<job_id>", methods=["GET"])(
+    token_required(role_required(["admin", "master"])(UserController.get_import))
+)
+
 # PUT /users/<target_id> -> Actualizar usuario
 user_bp.route("/<target_id>", methods=["PUT"])(
     token_required(role_required(["admin", "master"])(UserController.update_user))
@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+
+from app.utils.bloom_filter import BloomFilter
+from app.utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+lookups_total = registry.counter(
+    "email_filter_lookups_total",
+    "Consultas al filtro de emails registrados",
+    labelnames=("result",),
+)
+
+
+class EmailFilter:
+    """
+    Filtro de emails registrados para rechazar logins de emails inexistentes
+    sin consultar MongoDB.
+
+    - Se construye desde MongoDB proyectando solo email, en segundo plano.
+    - add() lo actualiza al crear usuarios o cambiar el email y sube la version de
+      emails compartida (un contador propio: editar otros campos no la cambia).
+    - Un hilo por proceso lee esa version cada poll_seconds. Si otro worker añadio
+      emails, los "ausentes" dejan de ser fiables (se consulta MongoDB) hasta la
+      siguiente reconstruccion, como mucho una cada rebuild_seconds. El login solo
+      consulta memoria; la ventana de falsos negativos es de poll_seconds.
+    - Las bajas no se quitan del filtro (un Bloom no admite borrado seguro y otro
+      worker pudo añadir claves que este no conoce): cuentan para adelantar la
+      reconstruccion. Un email borrado que sigue en el filtro solo cuesta una consulta.
+    - Se reconstruye ademas cada refresh_seconds.
+      Mientras no esta listo, might_contain devuelve True (se consulta MongoDB).
+    """
+
+    def __init__(self, collection, version, error_rate: float, refresh_seconds: int,
+                 poll_seconds: float = 2.0, rebuild_seconds: float = 30.0, rebuild_ratio: float = 0.1):
+        self.collection = collection
+        self.version = version
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.poll_seconds = poll_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.rebuild_ratio = rebuild_ratio
+        self._filter = None
+        self._built_at = 0.0
+        self._built_version = 0
+        self._seen_version = 0
+        self._stale = 0
+        self._building = False
+        self._pending = []
+        self._polling = False
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Lanza la construccion y el sondeo de la version para el proceso actual
+        """
+        self._ensure_polling()
+        self._rebuild_async()
+
+    def might_contain(self, email: str) -> bool:
+        if not isinstance(email, str):
+            return True
+        self._ensure_polling()
+        current = self._filter
+        if current is None:
+            self._rebuild_async()
+            lookups_total.inc(1, "not_ready")
+            return True
+        if current.might_contain(email):
+            lookups_total.inc(1, "maybe")
+            return True
+        if self._seen_version > self._built_version:
+            # Otro worker añadio emails que este filtro aun no tiene
+            lookups_total.inc(1, "changed")
+            return True
+        lookups_total.inc(1, "absent")
+        return False
+
+    def add(self, *emails: str):
+        emails = [email for email in emails if email]
+        if not emails:
+            return
+        with self._lock:
+            for email in emails:
+                if self._filter is not None:
+                    self._filter.add(email)
+                if self._building:
+                    self._pending.append(email)
+        version = self.version.bump()
+        with self._lock:
+            # Si nadie mas cambio los emails, este filtro sigue al dia con la nueva version
+            if version is not None and self._filter is not None and version == self._built_version + 1:
+                self._built_version = version
+
+    def discard(self, email: str):
+        if not email:
+            return
+        with self._lock:
+            self._stale += 1
+            needs_rebuild = self._filter is not None and self._stale > self._filter.count * self.rebuild_ratio
+        if needs_rebuild:
+            self._rebuild_async()
+
+    def poll(self):
+        """
+        Lee la version de emails y reconstruye si cambio o si toca el refresco periodico
+        """
+        version = self.version.current()
+        self._seen_version = max(self._seen_version, version)
+        age = time.monotonic() - self._built_at
+        changed = self._seen_version > self._built_version
+        if (changed and age > self.rebuild_seconds) or age > self.refresh_seconds:
+            self._rebuild_async()
+
+    def _ensure_polling(self):
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        if self._polling:
+            return
+        with self._lock:
+            if self._polling:
+                return
+            self._polling = True
+        threading.Thread(target=self._poll_loop, name="email-filter-poll", daemon=True).start()
+
+    def _poll_loop(self):
+        while self._polling:
+            time.sleep(self.poll_seconds)
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling email filter version: {e}", exc_info=True)
+
+    def _reset_after_fork(self):
+        # Un fork hereda el filtro pero no los hilos de sondeo ni de construccion
+        with self._lock:
+            self._building = False
+            self._polling = False
+            self._pending = []
+            self._pid = os.getpid()
+
+    def _rebuild_async(self):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._pending = []
+            self._pid = os.getpid()
+        threading.Thread(target=self._rebuild, name="email-filter", daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            # Version antes que los datos: un alta concurrente deja la version
+            # construida por detras y el sondeo lo detecta
+            version = self.version.current()
+            emails = [
+                doc["email"]
+                for doc in self.collection.find({}, {"_id": 0, "email": 1})
+                if doc.get("email")
+            ]
+            bloom = BloomFilter(int(len(emails) * 1.25) + 1000, self.error_rate)
+            for email in emails:
+                bloom.add(email)
+            with self._lock:
+                # Altas ocurridas mientras se leia la coleccion
+                for email in self._pending:
+                    bloom.add(email)
+                self._filter = bloom
+                self._built_at = time.monotonic()
+                self._built_version = version
+                self._seen_version = max(self._seen_version, version)
+                self._stale = 0
+            logger.info(f"Email filter built: {len(emails)} emails, {bloom.size_bytes()} bytes")
+        except Exception as e:
+            logger.error(f"Error building email filter: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._building = False
+                self._pending = []
@@ -0,0 +1,114 @@
+import itertools
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from app.auth.identity import Identity
+from app.config.app_config import Config
+from app.config.mongo_config import db
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+# Una entrada por importacion: {_id, status, created_by, total, processed, created,
+# failed, results, created_at, updated_at, finished_at, expires_at}
+import_jobs_collection = db["import_jobs"]
+
+_runner = None
+_runner_pid = None
+_runner_lock = threading.Lock()
+
+
+def _import_runner() -> ThreadPoolExecutor:
+    """
+    Un hilo por proceso: las importaciones se ejecutan de una en una y sus hashes
+    comparten el pool de Argon2 con las peticiones. Se recrea tras un fork.
+    """
+    global _runner, _runner_pid
+    with _runner_lock:
+        if _runner is None or _runner_pid != os.getpid():
+            _runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-import")
+            _runner_pid = os.getpid()
+        return _runner
+
+
+class ImportJobService:
+    """
+    Importaciones masivas en segundo plano. La peticion solo lee las filas y encola
+    el trabajo (202); el estado y el reporte por fila se guardan en MongoDB, asi que
+    cualquier worker responde a GET /users/bulk/<job_id>. Si el worker que la
+    ejecuta muere, el trabajo queda en "running" sin avanzar (ver updated_at).
+    """
+
+    @staticmethod
+    def start_import(identity: Identity, rows):
+        try:
+            rows = list(itertools.islice(rows, Config.BULK_IMPORT_MAX_ROWS + 1))
+            if not rows:
+                return {"error": "No rows to import"}, 400
+            if len(rows) > Config.BULK_IMPORT_MAX_ROWS:
+                return {"error": f"Import limited to {Config.BULK_IMPORT_MAX_ROWS} rows"}, 413
+
+            job_id = uuid.uuid4().hex
+            now = datetime.now(timezone.utc)
+            import_jobs_collection.insert_one({
+                "_id": job_id,
+                "status": "queued",
+                "created_by": identity.user_id,
+                "total": len(rows),
+                "processed": 0,
+                "created": 0,
+                "failed": 0,
+                "results": [],
+                "created_at": now,
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=Config.BULK_IMPORT_JOB_TTL),
+            })
+            _import_runner().submit(ImportJobService._run, identity, job_id, rows)
+            logger.info(f"Bulk import {job_id} queued by {identity.role} ({identity.user_id}): {len(rows)} rows")
+            return {"job_id": job_id, "status": "queued", "total": len(rows)}, 202
+        except Exception as e:
+            logger.error(f"Error in start_import: {e}", exc_info=True)
+            return {"error": "Internal server error"}, 500
+
+    @staticmethod
+    def get_import(identity: Identity, job_id: str):
+        """
+        Estado de una importacion; solo la ve quien la lanzo o un master
+        """
+        try:
+            job = import_jobs_collection.find_one({"_id": str(job_id)}, {"expires_at": 0})
+            if not job or (job["created_by"] != identity.user_id and identity.role != "master"):
+                return {"error": "Import job not found"}, 404
+            job["job_id"] = job.pop("_id")
+            return job, 200
+        except Exception as e:
+            logger.error(f"Error in get_import: {e}", exc_info=True)
+            return {"error": "Internal server error"}, 500
+
+    @staticmethod
+    def _run(identity: Identity, job_id: str, rows: list):
+        jobs = import_jobs_collection
+        try:
+            jobs.update_one({"_id": job_id}, {"$set": {"status": "running", "updated_at": datetime.now(timezone.utc)}})
+
+            def on_batch(report):
+                created = sum(1 for result in report if result["status"] == "created")
+                jobs.update_one({"_id": job_id}, {
+                    "$push": {"results": {"$each": report}},
+                    "$inc": {"processed": len(report), "created": created, "failed": len(report) - created},
+                    "$set": {"updated_at": datetime.now(timezone.utc)},
+                })
+
+            UserService.import_users(identity, rows, on_batch=on_batch)
+            status = "done"
+        except Exception as e:
+            logger.error(f"Error in bulk import {job_id}: {e}", exc_info=True)
+            status = "failed"
+        now = datetime.now(timezone.utc)
+        try:
+            jobs.update_one({"_id": job_id}, {"$set": {"status": status, "updated_at": now, "finished_at": now}})
+        except Exception as e:
+            logger.error(f"Error finishing bulk import {job_id}: {e}", exc_info=True)
@@ -1,57 +1,205 @@
-import io
-import qrcode
+import asyncio
 import base64
+from functools import partial
 
-from flask_jwt_extended import get_jwt  
+from app.auth.identity import Identity
 from app.auth.jwt_auth import generate_temporary_token, verify_token
-from app.config.mongo_config import db
+from app.config.app_config import Config
+from app.utils.qr_utils import render_qr
+from app.utils.request_timing import timed
+from app.utils.cache_utils import TTLSet
+from app.services.token_blocklist import token_blocklist
+from app.services.user_cache import user_cache
+from app.utils.replay_guard import create_replay_store
 
-users_collection = db["users"]
+# Usuarios confirmados como activos recientemente (modo stateless)
+active_users = TTLSet(ttl=Config.QR_ACTIVE_USERS_TTL, maxsize=Config.QR_ACTIVE_USERS_MAX)
+# jti ya consumidos (modo de un solo uso)
+replay_store = create_replay_store(
+    Config.QR_REPLAY_BACKEND,
+    Config.QR_REPLAY_ADDRESS,
+    Config.QR_REPLAY_AUTHKEY,
+)
 
 class QRService:
 
     @staticmethod
-    def generate_qr_for_user(user_id):
+    def generate_qr_for_user(identity: Identity, fmt: str = "png"):
         """
         Genera un JWT temporal para el QR usando user_id y role,
         y lo convierte en QR base64
         """
-        claims = get_jwt()
-        role = claims.get("role", "user")
+        token, image, mimetype = QRService.generate_qr_image(identity, fmt)
+        img_str = base64.b64encode(image).decode()
 
-        # Genera un token temporal (10 minutos)
-        token = generate_temporary_token(user_id, role)
+        return {"qr_token": img_str, "token": token, "format": fmt, "mimetype": mimetype}
 
-        # Genera el QR
-        qr = qrcode.QRCode(
-            version=1,
-            box_size=10,
-            border=5
-        )
-        qr.add_data(token)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
+    @staticmethod
+    def generate_qr_image(identity: Identity, fmt: str = "png", box_size: int = None):
+        """
+        Genera el token temporal y la imagen del QR en bytes.
+        Devuelve (token, bytes, mimetype).
+        """
+        # Genera un token temporal (QR_TOKEN_MINUTES, 10 por defecto)
+        token = generate_temporary_token(identity.user_id, identity.role, minutes=Config.QR_TOKEN_MINUTES)
+
+        with timed("qr_render"):
+            image, mimetype = render_qr(
+                token,
+                fmt,
+                box_size=box_size or Config.QR_BOX_SIZE,
+                border=Config.QR_BORDER,
+                mask_pattern=Config.QR_MASK_PATTERN,
+            )
+        return token, image, mimetype
+
+    @staticmethod
+    async def generate_qr_for_user_async(identity: Identity, fmt: str = "png"):
+        """
+        Version async de generate_qr_for_user
+        """
+        token, image, mimetype = await QRService.generate_qr_image_async(identity, fmt)
+        img_str = base64.b64encode(image).decode()
 
-        # Convierte a base64
-        buffered = io.BytesIO()
-        img.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        return {"qr_token": img_str, "token": token, "format": fmt, "mimetype": mimetype}
 
-        return {"qr_token": img_str, "token": token}
+    @staticmethod
+    async def generate_qr_image_async(identity: Identity, fmt: str = "png", box_size: int = None):
+        """
+        Version async de generate_qr_image: el renderizado (CPU) se hace en el executor del loop
+        """
+        token = generate_temporary_token(identity.user_id, identity.role, minutes=Config.QR_TOKEN_MINUTES)
+
+        render = partial(
+            render_qr,
+            token,
+            fmt,
+            box_size=box_size or Config.QR_BOX_SIZE,
+            border=Config.QR_BORDER,
+            mask_pattern=Config.QR_MASK_PATTERN,
+        )
+        with timed("qr_render"):
+            image, mimetype = await asyncio.get_running_loop().run_in_executor(None, render)
+        return token, image, mimetype
 
     @staticmethod
     def validate_qr(token):
         """
         Valida un JWT temporal y verifica que el user_id exista en la base de datos.
+        En modo stateless, si el usuario se confirmo hace poco no se consulta MongoDB.
         """
-        payload = verify_token(token)
+        payload = QRService._decode(token)
         if not payload:
             return None
 
-        user_id = payload.get("sub")
-        user_doc = users_collection.find_one({"_id": str(user_id)})
-        if not user_doc:
+        user_id = payload["user_id"]
+        if not QRService._known_active(user_id) and user_id not in QRService._fetch_active([user_id]):
+            return None
+
+        # El jti se consume al final para no gastar tokens que no eran validos
+        if not QRService._consume(payload):
             return None
 
         # Devuelve user_id y rol si todo es válido
         return {"user_id": user_id, "role": payload.get("role")}
+
+    @staticmethod
+    async def validate_qr_async(token):
+        """
+        Version async de validate_qr con el driver async de MongoDB
+        """
+        payload = QRService._decode(token)
+        if not payload:
+            return None
+
+        user_id = payload["user_id"]
+        if not QRService._known_active(user_id):
+            user_doc = await user_cache.get_async(user_id)
+            if not user_doc:
+                return None
+            active_users.add(user_id)
+
+        if not QRService._consume(payload):
+            return None
+
+        return {"user_id": user_id, "role": payload.get("role")}
+
+    @staticmethod
+    def validate_qr_batch(tokens: list) -> list:
+        """
+        Valida una lista de QR (escaneos acumulados sin conexion).
+        Resuelve todos los usuarios con una sola consulta $in y devuelve
+        un resultado por token, en el mismo orden.
+        """
+        payloads = [QRService._decode(token) if isinstance(token, str) else None for token in tokens]
+
+        pending = {
+            payload["user_id"]
+            for payload in payloads
+            if payload and not QRService._known_active(payload["user_id"])
+        }
+        existing = QRService._fetch_active(pending) if pending else set()
+
+        results = []
+        for payload in payloads:
+            if not payload:
+                results.append({"valid": False, "error": "Invalid or expired QR token"})
+                continue
+            user_id = payload["user_id"]
+            if user_id in pending and user_id not in existing:
+                results.append({"valid": False, "error": "Invalid or expired QR token"})
+                continue
+            if not QRService._consume(payload):
+                results.append({"valid": False, "error": "QR token already used"})
+                continue
+            results.append({"valid": True, "user_id": user_id, "role": payload.get("role")})
+        return results
+
+    @staticmethod
+    def _decode(token):
+        """
+        Verifica firma, expiracion y revocaciones. Devuelve el payload o None.
+        """
+        payload = verify_token(token)
+        if not payload or not payload.get("user_id"):
+            return None
+        payload["user_id"] = str(payload["user_id"])
+        # Usuarios eliminados o con cambio de rol (compartido entre workers)
+        if token_blocklist.is_user_revoked(payload["user_id"], payload):
+            return None
+        return payload
+
+    @staticmethod
+    def _known_active(user_id: str) -> bool:
+        return Config.QR_VALIDATION_MODE == "stateless" and user_id in active_users
+
+    @staticmethod
+    def _fetch_active(user_ids) -> set:
+        """
+        Devuelve los ids que existen (cache de usuarios y, para el resto, una
+        sola consulta a MongoDB) y los marca como activos
+        """
+        found = set(user_cache.get_many(user_ids))
+        for user_id in found:
+            active_users.add(user_id)
+        return found
+
+    @staticmethod
+    def _consume(payload) -> bool:
+        """
+        En modo de un solo uso marca el jti como usado; False si ya se habia usado
+        """
+        if not Config.QR_SINGLE_USE:
+            return True
+        jti = payload.get("jti")
+        if not jti:
+            return False
+        return replay_store.check_and_set(jti, payload["exp"])
+
+    @staticmethod
+    def revoke_user(user_id):
+        """
+        Olvida al usuario en la cache de activos. La invalidacion de sus QR la hace
+        TokenService.revoke_user (lista de revocacion comun a todos los tokens).
+        """
+        active_users.discard(str(user_id))
@@ -0,0 +1,175 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.config.app_config import Config
+from app.config.mongo_config import db
+
+logger = logging.getLogger(__name__)
+# Revocaciones compartidas entre workers; el indice TTL borra las ya innecesarias
+revocations_collection = db["token_revocations"]
+
+# Margen al leer revocaciones recientes (desfase de relojes entre servidores)
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def _max_token_lifetime() -> float:
+    """
+    Vida maxima de cualquier token (access, refresh o QR): hasta entonces
+    hay que recordar el "not before" de un usuario
+    """
+    lifetimes = (Config.JWT_ACCESS_TOKEN_EXPIRES, Config.JWT_REFRESH_TOKEN_EXPIRES)
+    if any(lifetime is None for lifetime in lifetimes):
+        return float("inf")
+    seconds = [lifetime.total_seconds() for lifetime in lifetimes]
+    return max(seconds + [Config.QR_TOKEN_MINUTES * 60])
+
+
+def _expires_at(timestamp: float):
+    if timestamp == float("inf"):
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def issued_ms(claims: dict) -> float:
+    """
+    Emision del token en milisegundos: claim iat_ms o, en tokens anteriores a
+    ese claim, iat en segundos (se compara de forma conservadora)
+    """
+    issued = claims.get("iat_ms")
+    if issued is None:
+        return (claims.get("iat") or 0) * 1000 + 999
+    return issued
+
+
+class TokenBlocklist:
+    """
+    Lista de revocacion de JWT:
+    - por jti (logout), hasta que el token caduque;
+    - por usuario ("not before", en ms): invalida todo token emitido antes (baja o
+      cambio de rol). Se compara con iat_ms: un token emitido en el mismo segundo
+      pero despues de la revocacion sigue siendo valido.
+
+    is_revoked solo consulta diccionarios en memoria (sin MongoDB). Las revocaciones
+    se aplican al instante en el worker que las hace y se guardan en MongoDB; un hilo
+    por proceso trae las de los demas workers cada sync_seconds.
+    """
+
+    def __init__(self, collection, sync_seconds: float, user_ttl: float):
+        self.collection = collection
+        self.sync_seconds = sync_seconds
+        self.user_ttl = user_ttl
+        self._jtis = {}        # jti -> exp
+        self._not_before = {}  # user_id -> instante de revocacion (ms)
+        self._synced_at = None
+        self._running = False
+        self._lock = threading.Lock()
+        # El hilo de sincronizacion no sobrevive a un fork: el hijo arranca el suyo
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def is_revoked(self, claims: dict) -> bool:
+        if not self._running:
+            self._start_sync()
+        if claims.get("jti") in self._jtis:
+            return True
+        not_before = self._not_before.get(claims.get("sub"))
+        return not_before is not None and issued_ms(claims) <= not_before
+
+    def is_user_revoked(self, user_id: str, claims: dict) -> bool:
+        if not self._running:
+            self._start_sync()
+        not_before = self._not_before.get(user_id)
+        return not_before is not None and issued_ms(claims) <= not_before
+
+    def revoke_token(self, jti: str, expires: float = None):
+        """
+        Revoca un token concreto hasta su expiracion (exp del JWT)
+        """
+        expires = float("inf") if expires is None else float(expires)
+        self._jtis[jti] = expires
+        self.collection.update_one(
+            {"_id": f"jti:{jti}"},
+            {"$set": {
+                "kind": "jti",
+                "key": jti,
+                "value": expires,
+                "created_at": datetime.now(timezone.utc),
+                "expires_at": _expires_at(expires),
+            }},
+            upsert=True,
+        )
+
+    def revoke_user(self, user_id: str):
+        """
+        Invalida todos los tokens del usuario emitidos hasta ahora
+        """
+        user_id, now = str(user_id), time.time()
+        self._apply_user(user_id, now)
+        self.collection.update_one(
+            {"_id": f"user:{user_id}"},
+            {"$set": {
+                "kind": "user",
+                "key": user_id,
+                "value": now,
+                "created_at": datetime.now(timezone.utc),
+                "expires_at": _expires_at(now + self.user_ttl),
+            }},
+            upsert=True,
+        )
+
+    def sync(self):
+        """
+        Trae las revocaciones nuevas de MongoDB y descarta los jti ya caducados
+        """
+        started = datetime.now(timezone.utc)
+        query = {} if self._synced_at is None else {"created_at": {"$gte": self._synced_at - SYNC_OVERLAP}}
+        for doc in self.collection.find(query, {"kind": 1, "key": 1, "value": 1}):
+            if doc.get("kind") == "jti":
+                self._jtis[doc["key"]] = doc["value"]
+            elif doc.get("kind") == "user":
+                self._apply_user(doc["key"], doc["value"])
+        self._synced_at = started
+
+        # Caducados: un jti cuyo token ya expiro, o un "not before" mas antiguo que cualquier token vivo
+        now = time.time()
+        for jti in [jti for jti, expires in list(self._jtis.items()) if expires < now]:
+            self._jtis.pop(jti, None)
+        limit = (now - self.user_ttl) * 1000
+        for user_id in [user_id for user_id, revoked_at in list(self._not_before.items()) if revoked_at < limit]:
+            self._not_before.pop(user_id, None)
+
+    def _apply_user(self, user_id: str, revoked_at: float):
+        # revoked_at en segundos (como se guarda en MongoDB); en memoria en ms.
+        # Se conserva la revocacion mas reciente (pueden llegar desordenadas)
+        revoked_ms = revoked_at * 1000
+        with self._lock:
+            self._not_before[user_id] = max(revoked_ms, self._not_before.get(user_id, revoked_ms))
+
+    def _after_fork(self):
+        self._running = False
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def _start_sync(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._sync_loop, name="token-blocklist", daemon=True).start()
+
+    def _sync_loop(self):
+        while self._running:
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing token blocklist: {e}", exc_info=True)
+            time.sleep(self.sync_seconds)
+
+
+token_blocklist = TokenBlocklist(
+    revocations_collection,
+    sync_seconds=Config.TOKEN_BLOCKLIST_SYNC_SECONDS,
+    user_ttl=_max_token_lifetime(),
+)
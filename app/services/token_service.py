@@ -0,0 +1,141 @@
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from flask_jwt_extended import decode_token
+
+from app.auth.jwt_auth import generate_token, generate_refresh_token
+from app.config.mongo_config import db
+from app.services.token_blocklist import token_blocklist
+
+logger = logging.getLogger(__name__)
+# Una entrada por familia de refresh tokens: {_id, user_id, gen, revoked, expires_at}
+families_collection = db["refresh_families"]
+users_collection = db["users"]
+
+
+class TokenService:
+    """
+    Emision y rotacion de tokens. Cada login abre una familia de refresh tokens;
+    cada refresh entrega un token de la generacion siguiente e invalida el anterior.
+    Presentar un token ya usado revoca la familia entera (deteccion de reutilizacion).
+    """
+
+    @staticmethod
+    def issue_tokens(user_id: str, role: str) -> dict:
+        """
+        Access token + refresh token de una familia nueva. No escribe en MongoDB:
+        la familia se registra en su primer refresh.
+        """
+        family = uuid.uuid4().hex
+        return {
+            "access_token": generate_token(user_id, role),
+            "refresh_token": generate_refresh_token(user_id, family, 0),
+        }
+
+    @staticmethod
+    def refresh(claims: dict):
+        """
+        Rota el refresh token recibido (claims ya verificados) sin pasar por Argon2.
+        El rol se lee de la base de datos, asi que un cambio de rol o una baja se
+        aplican en el siguiente refresh.
+        """
+        user_id, family, generation = claims.get("sub"), claims.get("fam"), claims.get("gen")
+        if not user_id or not family or not isinstance(generation, int):
+            return {"error": "Invalid refresh token"}, 401
+
+        try:
+            expires_at = TokenService._family_expiry()
+            user_doc = users_collection.find_one({"_id": str(user_id)}, {"role": 1})
+            if not user_doc:
+                TokenService.revoke_family(family, expires_at)
+                return {"error": "User not found"}, 401
+
+            if not TokenService._advance_family(user_id, family, generation, expires_at):
+                logger.warning(f"Refresh token reuse detected for user {user_id} (family {family})")
+                TokenService.revoke_family(family, expires_at)
+                return {"error": "Refresh token reuse detected"}, 401
+
+            role = user_doc.get("role", "user")
+            return {
+                "access_token": generate_token(user_id, role),
+                "refresh_token": generate_refresh_token(user_id, family, generation + 1),
+            }, 200
+        except Exception as e:
+            logger.error(f"Error in refresh: {e}", exc_info=True)
+            return {"error": "Internal server error"}, 500
+
+    @staticmethod
+    def logout(claims: dict, refresh_token: str = None):
+        """
+        Revoca el access token de la peticion y, si se envia, la familia de su refresh token
+        """
+        try:
+            token_blocklist.revoke_token(claims["jti"], claims.get("exp"))
+            if refresh_token:
+                try:
+                    refresh_claims = decode_token(refresh_token)
+                except Exception:
+                    refresh_claims = {}
+                if refresh_claims.get("type") == "refresh" and refresh_claims.get("sub") == claims.get("sub"):
+                    expires = refresh_claims.get("exp")
+                    TokenService.revoke_family(
+                        refresh_claims.get("fam"),
+                        datetime.fromtimestamp(expires, timezone.utc) if expires else None,
+                    )
+            logger.info(f"User logged out: {claims.get('sub')}")
+            return {"message": "Logout exitoso"}, 200
+        except Exception as e:
+            logger.error(f"Error in logout: {e}", exc_info=True)
+            return {"error": "Internal server error"}, 500
+
+    @staticmethod
+    def revoke_user(user_id: str):
+        """
+        Invalida todos los tokens ya emitidos para el usuario (access, refresh y QR)
+        """
+        token_blocklist.revoke_user(user_id)
+
+    @staticmethod
+    def revoke_family(family: str, expires_at=None):
+        # upsert: una familia que aun no hizo su primer refresh tambien queda revocada
+        families_collection.update_one(
+            {"_id": family},
+            {"$set": {"revoked": True}, "$setOnInsert": {"gen": 0, "expires_at": expires_at}},
+            upsert=True,
+        )
+
+    @staticmethod
+    def _advance_family(user_id: str, family: str, generation: int, expires_at) -> bool:
+        """
+        Pasa la familia a la generacion siguiente si el token presentado es el vigente.
+        Atomico: de dos refresh simultaneos con el mismo token solo uno avanza.
+        """
+        if generation == 0:
+            try:
+                families_collection.insert_one(
+                    {"_id": family, "user_id": str(user_id), "gen": 1, "revoked": False, "expires_at": expires_at}
+                )
+                return True
+            except DuplicateKeyError:
+                return False
+
+        doc = families_collection.find_one_and_update(
+            {"_id": family, "gen": generation, "revoked": False},
+            {"$inc": {"gen": 1}, "$set": {"expires_at": expires_at}},
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc is not None
+
+    @staticmethod
+    def _family_expiry():
+        # Caducidad deslizante: la familia vive lo mismo que su ultimo refresh token
+        expires = current_app.config.get("JWT_REFRESH_TOKEN_EXPIRES")
+        if not expires:
+            return None
+        return datetime.now(timezone.utc) + expires
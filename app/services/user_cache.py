@@ -0,0 +1,86 @@
+from app.config.app_config import Config
+from app.config.mongo_config import db, async_db
+from app.utils.cache_utils import LRUCache
+from app.utils.metrics import registry
+
+# Solo lo que necesitan los controles de permisos y la validacion de QR (nunca el hash)
+USER_CACHE_PROJECTION = {"role": 1, "email": 1}
+
+
+class UserCache:
+    """
+    Cache de lectura de usuarios por _id ({_id, role, email}).
+    - get() consulta MongoDB solo si no hay entrada vigente; los usuarios
+      inexistentes no se cachean.
+    - UserService llama a invalidate() tras cada escritura. Los cambios hechos
+      en otro worker se ven al caducar la entrada (USER_CACHE_TTL); las escrituras
+      que dependen del rol lo comprueban en el propio filtro del update/delete.
+    """
+
+    def __init__(self, collection, async_collection, maxsize: int, ttl: float):
+        self.collection = collection
+        self.async_collection = async_collection
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._requests = registry.counter(
+            "user_cache_requests_total",
+            "Consultas a la cache de usuarios",
+            labelnames=("result",),
+        )
+        registry.gauge("user_cache_entries", "Usuarios en cache", func=lambda: len(self._cache))
+        registry.gauge("user_cache_hit_ratio", "Aciertos / consultas de la cache de usuarios",
+                       func=self._cache.hit_ratio, multiprocess_mode="liveall")
+        registry.gauge("user_cache_evictions", "Entradas desalojadas por tamaño",
+                       func=lambda: self._cache.evictions)
+
+    def get(self, user_id: str):
+        user_id = str(user_id)
+        user = self._lookup(user_id)
+        if user is None:
+            user = self.collection.find_one({"_id": user_id}, USER_CACHE_PROJECTION)
+            self._store(user)
+        return user
+
+    async def get_async(self, user_id: str):
+        user_id = str(user_id)
+        user = self._lookup(user_id)
+        if user is None:
+            user = await self.async_collection.find_one({"_id": user_id}, USER_CACHE_PROJECTION)
+            self._store(user)
+        return user
+
+    def get_many(self, user_ids) -> dict:
+        """
+        Usuarios existentes entre user_ids; los que no estan en cache se piden en una sola consulta $in
+        """
+        found, missing = {}, []
+        for user_id in {str(user_id) for user_id in user_ids}:
+            user = self._lookup(user_id)
+            if user is None:
+                missing.append(user_id)
+            else:
+                found[user_id] = user
+        if missing:
+            for user in self.collection.find({"_id": {"$in": missing}}, USER_CACHE_PROJECTION):
+                self._store(user)
+                found[str(user["_id"])] = user
+        return found
+
+    def invalidate(self, user_id: str):
+        self._cache.pop(str(user_id))
+
+    def _lookup(self, user_id: str):
+        user = self._cache.get(user_id)
+        self._requests.inc(1, "hit" if user is not None else "miss")
+        return user
+
+    def _store(self, user):
+        if user is not None:
+            self._cache.set(str(user["_id"]), user)
+
+
+user_cache = UserCache(
+    db["users"],
+    async_db["users"],
+    maxsize=Config.USER_CACHE_MAXSIZE,
+    ttl=Config.USER_CACHE_TTL,
+)
@@ -1,15 +1,61 @@
 import logging
 
-from app.auth.jwt_auth import generate_token
-from flask_jwt_extended import get_jwt_identity, get_jwt, create_access_token
-from app.auth.password_auth import hash_password, verify_password
-from app.config.mongo_config import db
-from app.validators.user_validator import UserValidator
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+
+from app.auth.identity import Identity
+from app.auth.password_auth import (
+    hash_password,
+    submit_hash_password,
+    verify_password_async,
+    hash_passwords_parallel,
+    verify_password,
+    verify_dummy,
+    verify_dummy_async,
+    needs_rehash,
+    PasswordHashBusyError,
+)
+from app.config.app_config import Config
+from app.config.mongo_config import db, async_db
+from app.validators.user_validator import UserValidator, UPDATE_USER_SCHEMA
 from app.utils.permission_utils import RolePermissions
+from app.services.qr_service import QRService
+from app.services.token_service import TokenService
+from app.services.user_cache import user_cache
+from app.services.email_filter import EmailFilter
+from app.utils.collection_version import CollectionVersion
 
 logger = logging.getLogger(__name__)
 validator = UserValidator(db["users"])
 users_collection = db["users"]
+# Listados: admiten lecturas en secundarios (MONGO_LISTING_READ_PREFERENCE)
+listing_collection = db.collection("users", secondary_reads=True)
+# Modo async (AsyncMongoClient)
+async_users_collection = async_db["users"]
+async_listing_collection = async_db.collection("users", secondary_reads=True)
+
+# Version de la coleccion de usuarios (ETag de los listados). Se lee en el primario:
+# si los listados van a secundarios los datos pueden ir por detras de la version y
+# el ETag no seria fiable, asi que en ese caso no se usan ETags
+users_version = CollectionVersion(db["counters"], "users", async_db["counters"])
+LISTING_ETAGS = Config.MONGO_LISTING_READ_PREFERENCE == "primary"
+
+# Emails registrados: evita consultar la coleccion de usuarios en logins de emails
+# inexistentes. Su version solo cambia con altas y cambios de email
+email_filter = EmailFilter(
+    users_collection,
+    CollectionVersion(db["counters"], "user_emails"),
+    error_rate=Config.EMAIL_FILTER_ERROR_RATE,
+    refresh_seconds=Config.EMAIL_FILTER_REFRESH_SECONDS,
+    poll_seconds=Config.EMAIL_FILTER_POLL_SECONDS,
+    rebuild_seconds=Config.EMAIL_FILTER_REBUILD_SECONDS,
+)
+
+# Campos que nunca deben salir de la base de datos en los listados
+USER_PUBLIC_PROJECTION = {"password": 0}
+
+# Documentos por lote al transmitir listados completos
+STREAM_BATCH_SIZE = 500
 
 class UserService:
     """
@@ -21,58 +67,169 @@ class UserService:
     # GET USERS
     # ==============================
     @staticmethod
-    def get_users():
+    def get_users(identity: Identity):
         """
-        Devuelve usuarios según el rol extraído del JWT.
+        Devuelve los usuarios visibles para el rol indicado.
+        El filtro por rol y la exclusion del password se resuelven en MongoDB.
         """
 
         users = []
         try:
-            claims = get_jwt()
-            current_role = claims.get("role", "user")
-
-            for user_data in users_collection.find({}):
-                user_role = user_data.get("role", "").lower()
-
-                if current_role == "master" and user_role == "admin":
-                    user_data.pop("password", None)
-                    user_data["id"] = str(user_data["_id"])
-                    users.append(user_data)
-                elif current_role == "admin" and user_role == "user":
-                    user_data.pop("password", None)
-                    user_data["id"] = str(user_data["_id"])
-                    users.append(user_data)
+            query = RolePermissions.visibility_filter(identity.role)
+            if query is None:
+                return users
+
+            for user_data in listing_collection.find(query, USER_PUBLIC_PROJECTION):
+                user_data["id"] = str(user_data["_id"])
+                users.append(user_data)
             return users
         except Exception as e:
             logger.error(f"Error in get_users: {e}", exc_info=True)
             return []
 
+    @staticmethod
+    def get_users_page(identity: Identity, after: str = None, limit: int = 100):
+        """
+        Devuelve una pagina de usuarios visibles para el rol indicado,
+        ordenada por _id (keyset pagination) y el cursor de la siguiente pagina.
+        """
+        query = RolePermissions.visibility_filter(identity.role)
+        if query is None:
+            return [], None
+        return UserService._find_page(query, after, limit)
+
+    @staticmethod
+    async def get_users_async(identity: Identity):
+        """
+        Version async de get_users (modo async)
+        """
+        query = RolePermissions.visibility_filter(identity.role)
+        if query is None:
+            return []
+        try:
+            users = await async_listing_collection.find(query, USER_PUBLIC_PROJECTION).to_list(None)
+        except Exception as e:
+            logger.error(f"Error in get_users_async: {e}", exc_info=True)
+            return []
+        for user_data in users:
+            user_data["id"] = str(user_data["_id"])
+        return users
+
+    @staticmethod
+    async def get_users_page_async(identity: Identity, after: str = None, limit: int = 100):
+        """
+        Version async de get_users_page (modo async)
+        """
+        query = RolePermissions.visibility_filter(identity.role)
+        if query is None:
+            return [], None
+        cursor = (
+            async_listing_collection.find(UserService._keyset_query(query, after), USER_PUBLIC_PROJECTION)
+            .sort("_id", ASCENDING)
+            .limit(limit + 1)
+        )
+        users = await cursor.to_list(limit + 1)
+        for user_data in users:
+            user_data["id"] = str(user_data["_id"])
+        return UserService._split_page(users, limit)
+
+    @staticmethod
+    def iter_users(identity: Identity, after: str = None):
+        """
+        Itera los usuarios visibles directamente desde el cursor de PyMongo,
+        sin construir la lista completa en memoria.
+        """
+        query = RolePermissions.visibility_filter(identity.role)
+        if query is None:
+            return iter(())
+        return UserService._iter_cursor(query, after)
+
     # ----- METODOS DE PRUEBA -----
     @staticmethod
     def get_all_users():
         users = []
-        for user_data in users_collection.find({}):
+        for user_data in listing_collection.find({}, USER_PUBLIC_PROJECTION):
             user_data["id"] = str(user_data["_id"])
             users.append(user_data)
         return users
 
+    @staticmethod
+    def get_all_users_page(after: str = None, limit: int = 100):
+        return UserService._find_page({}, after, limit)
+
+    @staticmethod
+    def iter_all_users(after: str = None):
+        return UserService._iter_cursor({}, after)
+
+    # ----- PAGINACION -----
+    @staticmethod
+    def get_users_version():
+        """
+        Version actual de la coleccion de usuarios; cambia con cada alta, edicion o baja.
+        None si los listados se leen de secundarios (sin ETag).
+        """
+        if not LISTING_ETAGS:
+            return None
+        return users_version.current()
+
+    @staticmethod
+    async def get_users_version_async():
+        if not LISTING_ETAGS:
+            return None
+        return await users_version.current_async()
+
+    @staticmethod
+    def _keyset_query(query: dict, after: str = None) -> dict:
+        if after is None:
+            return query
+        return {**query, "_id": {"$gt": str(after)}}
+
+    @staticmethod
+    def _find_page(query: dict, after: str, limit: int):
+        # Se pide un documento extra para saber si existe otra pagina
+        cursor = (
+            listing_collection.find(UserService._keyset_query(query, after), USER_PUBLIC_PROJECTION)
+            .sort("_id", ASCENDING)
+            .limit(limit + 1)
+        )
+        users = []
+        for user_data in cursor:
+            user_data["id"] = str(user_data["_id"])
+            users.append(user_data)
+        return UserService._split_page(users, limit)
+
+    @staticmethod
+    def _split_page(users: list, limit: int):
+        next_cursor = None
+        if len(users) > limit:
+            users = users[:limit]
+            next_cursor = users[-1]["id"]
+        return users, next_cursor
+
+    @staticmethod
+    def _iter_cursor(query: dict, after: str = None):
+        cursor = (
+            listing_collection.find(UserService._keyset_query(query, after), USER_PUBLIC_PROJECTION)
+            .sort("_id", ASCENDING)
+            .batch_size(STREAM_BATCH_SIZE)
+        )
+        try:
+            for user_data in cursor:
+                user_data["id"] = str(user_data["_id"])
+                yield user_data
+        finally:
+            cursor.close()
 
     # ==============================
     # ADD USER
     # ==============================
     @staticmethod
-    def add_user(data: dict):
+    def add_user(identity: Identity, data: dict):
         """
-        Crea un nuevo usuario. Extrae el rol del usuario logueado desde el JWT
-        y valida que pueda asignar el rol indicado al nuevo usuario.
+        Crea un nuevo usuario. Valida que el usuario que lo crea
+        pueda asignar el rol indicado al nuevo usuario.
         """
-        try:
-            current_id = get_jwt_identity()
-            claims = get_jwt()
-            current_role = claims.get("role", "user")
-        except Exception as e:
-            logger.error(f"Error extracting JWT info: {e}", exc_info=True)
-            return {"error": "Invalid token"}, 401
+        current_id, current_role = identity.user_id, identity.role
 
         document = data.get("document")
         document_type = data.get("document_type")
@@ -83,35 +240,14 @@ class UserService:
         email = data.get("email")
         phone = data.get("phone")
         password = data.get("password")
-        re_password = data.get("re_password")
 
         # Validaciones de formato
-        format_errors = {}
-        if not validator.is_valid_document(document):
-            format_errors["document"] = "Invalid document format"
-        if not validator.is_valid_document_type(document_type):
-            format_errors["document_type"] = "Invalid document type"
-        if not validator.is_valid_name(name):
-            format_errors["name"] = "Invalid name format"
-        if not validator.is_valid_last_name(last_name1) or not validator.is_valid_last_name(last_name2):
-            format_errors["last_names"] = "Invalid last names format"
-        if not validator.is_valid_email(email):
-            format_errors["email"] = "Invalid email format"
-        if not validator.is_valid_phone(phone):
-            format_errors["phone"] = "Invalid phone format"
-        if not validator.is_valid_password(password):
-            format_errors["password"] = "Invalid password format"
-        if not validator.is_valid_re_password(password, re_password):
-            format_errors["re_password"] = "Passwords do not match"
+        format_errors = validator.validate(data)
         if format_errors:
             return {"error": format_errors}, 400
 
         # Conflictos
-        conflict_errors = {}
-        if validator.is_document_registered(document):
-            conflict_errors["document"] = "Document already registered"
-        if validator.is_email_registered(email):
-            conflict_errors["email"] = "Email already registered"
+        conflict_errors = validator.find_conflicts(document, email)
         if conflict_errors:
             return {"error": conflict_errors}, 409
 
@@ -132,26 +268,165 @@ class UserService:
                 "password": hash_password(password),
             }
             users_collection.insert_one(new_user)
+            user_cache.invalidate(document)
+            email_filter.add(email)
+            users_version.bump()
             logger.info(f"New user registered: {document} by {current_role} ({current_id})")
             return {"message": "User added", "id": document}, 201
+        except DuplicateKeyError as e:
+            # Otra peticion inserto el mismo documento o email entre la consulta y el insert
+            return {"error": validator.duplicate_key_conflicts(e.details)}, 409
+        except PasswordHashBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error in add_user: {e}", exc_info=True)
             return {"error": "Internal server error"}, 500
 
+    # ==============================
+    # BULK IMPORT
+    # ==============================
+    @staticmethod
+    def import_users(identity: Identity, rows, on_batch=None) -> dict:
+        """
+        Importa usuarios en lotes: valida cada fila, detecta conflictos con una
+        consulta $in por lote, genera los hashes en paralelo y escribe con
+        insert_many no ordenado. Devuelve un reporte por fila; on_batch recibe
+        el reporte de cada lote (progreso de las importaciones en segundo plano).
+        """
+        results = []
+        batch = []
+
+        def flush():
+            report = UserService._import_batch(identity, batch)
+            results.extend(report)
+            if on_batch is not None:
+                on_batch(report)
+
+        for index, row in enumerate(rows, start=1):
+            if index > Config.BULK_IMPORT_MAX_ROWS:
+                results.append({"row": index, "status": "error", "code": 413,
+                                "error": f"Import limited to {Config.BULK_IMPORT_MAX_ROWS} rows"})
+                break
+            batch.append((index, row))
+            if len(batch) >= Config.BULK_IMPORT_BATCH_SIZE:
+                flush()
+                batch = []
+        if batch:
+            flush()
+
+        created = sum(1 for result in results if result["status"] == "created")
+        return {"created": created, "failed": len(results) - created, "results": results}
+
+    @staticmethod
+    def _import_batch(identity: Identity, batch: list) -> list:
+        report = {}
+        candidates = []
+        seen_documents, seen_emails = set(), set()
+
+        for index, row in batch:
+            if not isinstance(row, dict):
+                report[index] = {"row": index, "status": "error", "code": 400, "error": "Invalid row"}
+                continue
+            format_errors = validator.validate(row)
+            if format_errors:
+                report[index] = {"row": index, "status": "error", "code": 400, "error": format_errors}
+                continue
+            if not RolePermissions.can_create_user(identity.role, row.get("role")):
+                report[index] = {"row": index, "status": "error", "code": 403,
+                                 "error": "You cannot create a user with this role"}
+                continue
+            document, email = str(row["document"]), row["email"]
+            # Duplicados dentro del mismo archivo
+            duplicated = {}
+            if document in seen_documents:
+                duplicated["document"] = "Document repeated in import"
+            if email in seen_emails:
+                duplicated["email"] = "Email repeated in import"
+            if duplicated:
+                report[index] = {"row": index, "status": "error", "code": 409, "error": duplicated}
+                continue
+            seen_documents.add(document)
+            seen_emails.add(email)
+            candidates.append((index, row))
+
+        # Conflictos con la base de datos: una sola consulta por lote
+        if candidates:
+            registered_documents, registered_emails = set(), set()
+            cursor = users_collection.find(
+                {"$or": [{"_id": {"$in": list(seen_documents)}}, {"email": {"$in": list(seen_emails)}}]},
+                {"_id": 1, "email": 1},
+            )
+            for doc in cursor:
+                registered_documents.add(str(doc["_id"]))
+                registered_emails.add(doc.get("email"))
+
+            pending = []
+            for index, row in candidates:
+                conflicts = {}
+                if str(row["document"]) in registered_documents:
+                    conflicts["document"] = "Document already registered"
+                if row["email"] in registered_emails:
+                    conflicts["email"] = "Email already registered"
+                if conflicts:
+                    report[index] = {"row": index, "status": "error", "code": 409, "error": conflicts}
+                else:
+                    pending.append((index, row))
+            candidates = pending
+
+        if candidates:
+            hashes = hash_passwords_parallel([row["password"] for _, row in candidates])
+            new_users = [
+                {
+                    "_id": str(row["document"]),
+                    "document_type": row["document_type"],
+                    "role": row["role"],
+                    "name": row["name"],
+                    "last_name1": row["last_name1"],
+                    "last_name2": row["last_name2"],
+                    "email": row["email"],
+                    "phone": row["phone"],
+                    "password": password_hash,
+                }
+                for (_, row), password_hash in zip(candidates, hashes)
+            ]
+            failed = {}
+            try:
+                users_collection.insert_many(new_users, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    if write_error.get("code") == 11000:
+                        failed[write_error["index"]] = (409, validator.duplicate_key_conflicts(write_error))
+                    else:
+                        failed[write_error["index"]] = (500, "Internal server error")
+            if len(failed) < len(candidates):
+                users_version.bump()
+            created_emails = []
+            for position, (index, row) in enumerate(candidates):
+                if position in failed:
+                    code, error = failed[position]
+                    report[index] = {"row": index, "status": "error", "code": code, "error": error}
+                else:
+                    user_cache.invalidate(row["document"])
+                    created_emails.append(row["email"])
+                    report[index] = {"row": index, "status": "created", "id": str(row["document"])}
+            email_filter.add(*created_emails)
+            logger.info(f"Bulk import by {identity.role} ({identity.user_id}): "
+                        f"{len(candidates) - len(failed)} users created")
+
+        return [report[index] for index, _ in batch]
+
     # ==============================
     # UPDATE USER
     # ==============================
     @staticmethod
-    def update_user(user_id: str, data: dict):
+    def update_user(identity: Identity, user_id: str, data: dict):
         """
-        Actualiza un usuario. Extrae role y id del JWT para mayor seguridad.
+        Actualiza un usuario segun los permisos de la identidad que lo solicita.
         """
+        current_id, current_role = identity.user_id, identity.role
         try:
-            current_id = get_jwt_identity()
-            claims = get_jwt()
-            current_role = claims.get("role", "user")
 
-            target_doc = users_collection.find_one({"_id": str(user_id)})
+            target_doc = user_cache.get(user_id)
             if not target_doc:
                 return {"error": "Target user not found"}, 404
 
@@ -161,17 +436,13 @@ class UserService:
 
             allowed_fields = ["name", "last_name1", "last_name2", "phone", "email", "password", "role"]
             update_data = {}
+            # Los campos con formato invalido se ignoran
+            invalid_fields = validator.validate(data, UPDATE_USER_SCHEMA)
             for field in allowed_fields:
                 if field in data:
-                    if field in ["name", "last_name1", "last_name2"] and not validator.is_valid_name_and_last_name(data[field]):
-                        continue
-                    if field == "phone" and not validator.is_valid_phone(data[field]):
-                        continue
-                    if field == "email" and not validator.is_valid_email(data[field]):
+                    if field in invalid_fields:
                         continue
                     if field == "password":
-                        if not validator.is_valid_password(data["password"]):
-                            continue
                         update_data["password"] = hash_password(data["password"])
                         continue
                     if field == "role":
@@ -189,12 +460,31 @@ class UserService:
                     update_data[field] = data[field]
 
             if update_data:
-                users_collection.update_one({"_id": str(user_id)}, {"$set": update_data})
+                # El rol del filtro es el usado en los permisos: si cambio entretanto
+                # (p. ej. en otro worker, con la cache aun vigente) no se escribe nada
+                result = users_collection.update_one(
+                    {"_id": str(user_id), "role": target_doc.get("role")}, {"$set": update_data}
+                )
+                user_cache.invalidate(user_id)
+                if result.matched_count == 0:
+                    return {"error": "User was modified concurrently, retry"}, 409
+                if "email" in update_data and update_data["email"] != target_doc.get("email"):
+                    email_filter.add(update_data["email"])
+                    email_filter.discard(target_doc.get("email"))
+                users_version.bump()
+                if update_data.get("role", target_doc.get("role")) != target_doc.get("role"):
+                    TokenService.revoke_user(user_id)
+                    QRService.revoke_user(user_id)
                 logger.info(f"User {user_id} updated by {current_id}")
                 return {"message": "User updated"}, 200
 
             return {"error": "No valid fields to update"}, 400
 
+        except DuplicateKeyError as e:
+            # El nuevo email ya pertenece a otro usuario (indice unico email_1)
+            return {"error": validator.duplicate_key_conflicts(e.details)}, 409
+        except PasswordHashBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error updating user {user_id}: {e}", exc_info=True)
             return {"error": "Internal server error"}, 500
@@ -203,16 +493,14 @@ class UserService:
     # DELETE USER
     # ==============================
     @staticmethod
-    def delete_user(user_id: str):
+    def delete_user(identity: Identity, user_id: str):
         """
-        Elimina un usuario. Extrae role del JWT.
+        Elimina un usuario segun los permisos de la identidad que lo solicita.
         """
+        current_id, current_role = identity.user_id, identity.role
         try:
-            current_id = get_jwt_identity()
-            claims = get_jwt()
-            current_role = claims.get("role", "user")
 
-            target_doc = users_collection.find_one({"_id": str(user_id)})
+            target_doc = user_cache.get(user_id)
             if not target_doc:
                 return {"error": "User not found"}, 404
 
@@ -220,7 +508,14 @@ class UserService:
             if not RolePermissions.can_delete_user(current_role, target_role):
                 return {"error": "You do not have permission to delete this user"}, 403
 
-            users_collection.delete_one({"_id": str(user_id)})
+            result = users_collection.delete_one({"_id": str(user_id), "role": target_doc.get("role")})
+            user_cache.invalidate(user_id)
+            if result.deleted_count == 0:
+                return {"error": "User was modified concurrently, retry"}, 409
+            email_filter.discard(target_doc.get("email"))
+            users_version.bump()
+            TokenService.revoke_user(user_id)
+            QRService.revoke_user(user_id)
             logger.info(f"User deleted: {user_id} by {current_id}")
             return {"message": "User deleted"}, 200
 
@@ -236,44 +531,110 @@ class UserService:
         """
         Login de usuario usando email.
         Busca el usuario por email, obtiene su _id y genera token.
+        Email inexistente y contraseña incorrecta responden igual (401) y ambos
+        pasan por Argon2, para no revelar que emails estan registrados.
         """
         try:
+            if Config.EMAIL_FILTER_ENABLED and not email_filter.might_contain(email):
+                verify_dummy(password)
+                return {"error": "Email o contraseña incorrectos"}, 401
+
             user_doc = users_collection.find_one({"email": email})
             if not user_doc:
-                return {"error": "Email o contraseña incorrectos"}, 404
-
-            if not verify_password(user_doc.get("password", ""), password):
+                verify_dummy(password)
                 return {"error": "Email o contraseña incorrectos"}, 401
 
-            user_id = str(user_doc["_id"])  # usamos el _id real
-            role = user_doc.get("role", "user")
-            access_token = generate_token(user_id, role)
+            stored_hash = user_doc.get("password", "")
+            if not verify_password(stored_hash, password):
+                return {"error": "Email o contraseña incorrectos"}, 401
 
-            logger.info(f"User logged in: {email} with role {role}")
-            return {
-                "message": "Login exitoso",
-                "access_token": access_token,
-                "user": {"id": user_id, "role": role, "email": email},
-            }, 200
+            return UserService._login_success(user_doc, email, stored_hash, password)
+        except PasswordHashBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error in login_user: {e}", exc_info=True)
             return {"error": "Internal server error"}, 500
 
+    @staticmethod
+    async def login_user_async(email: str, password: str):
+        """
+        Igual que login_user con el driver async de MongoDB; Argon2 corre en su pool
+        """
+        try:
+            if Config.EMAIL_FILTER_ENABLED and not email_filter.might_contain(email):
+                await verify_dummy_async(password)
+                return {"error": "Email o contraseña incorrectos"}, 401
+
+            user_doc = await async_users_collection.find_one({"email": email})
+            if not user_doc:
+                await verify_dummy_async(password)
+                return {"error": "Email o contraseña incorrectos"}, 401
+
+            stored_hash = user_doc.get("password", "")
+            if not await verify_password_async(stored_hash, password):
+                return {"error": "Email o contraseña incorrectos"}, 401
+
+            return UserService._login_success(user_doc, email, stored_hash, password)
+        except PasswordHashBusyError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in login_user_async: {e}", exc_info=True)
+            return {"error": "Internal server error"}, 500
+
+    @staticmethod
+    def _login_success(user_doc: dict, email: str, stored_hash: str, password: str):
+        """
+        Respuesta de login tras verificar la contraseña (comun a sync y async)
+        """
+        user_id = str(user_doc["_id"])  # usamos el _id real
+        if needs_rehash(stored_hash):
+            UserService._schedule_rehash(user_doc["_id"], stored_hash, password)
+        role = user_doc.get("role", "user")
+        tokens = TokenService.issue_tokens(user_id, role)
+
+        logger.info(f"User logged in: {email} with role {role}")
+        return {
+            "message": "Login exitoso",
+            **tokens,
+            "user": {"id": user_id, "role": role, "email": email},
+        }, 200
+
+    @staticmethod
+    def _schedule_rehash(user_id, old_hash: str, password: str):
+        """
+        Recalcula el hash con los parametros actuales fuera de la peticion de login.
+        Solo se guarda si el hash no cambio entre tanto.
+        """
+        try:
+            future = submit_hash_password(password)
+        except PasswordHashBusyError:
+            # Pool saturado: se reintenta en el proximo login
+            return
+
+        def store(done):
+            try:
+                users_collection.update_one(
+                    {"_id": user_id, "password": old_hash},
+                    {"$set": {"password": done.result()}},
+                )
+                logger.info(f"Password rehashed for user {user_id}")
+            except Exception as e:
+                logger.error(f"Error rehashing password for {user_id}: {e}", exc_info=True)
+
+        future.add_done_callback(store)
+
     # ==============================
     # GET LOGGED USER
     # ==============================
     @staticmethod
-    def get_logged_user():
+    def get_logged_user(identity: Identity):
         """
         Devuelve la información del usuario logueado.
-        Extrae ID y rol directamente del JWT.
         """
         try:
-            user_id = get_jwt_identity()  
-            claims = get_jwt()            
-            role = claims.get("role", "user")
+            user_id, role = identity.user_id, identity.role
 
-            user_doc = users_collection.find_one({"_id": str(user_id)})
+            user_doc = user_cache.get(user_id)
             if not user_doc:
                 return {"error": "User not found"}, 404
 
@@ -0,0 +1,44 @@
+import logging
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionVersion:
+    """
+    Contador de version de una coleccion guardado en MongoDB ({_id: key, version: n}).
+    Se incrementa despues de cada escritura; como vive en MongoDB es comun a todos
+    los workers. Leerlo es una consulta por _id, mucho mas barata que el listado.
+    """
+
+    def __init__(self, collection, key: str, async_collection=None):
+        self.collection = collection
+        self.async_collection = async_collection
+        self.key = key
+
+    def bump(self):
+        """
+        Incrementa la version y devuelve la nueva (None si fallo)
+        """
+        # La escritura principal ya se hizo: un fallo aqui no debe convertirla en error
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": self.key},
+                {"$inc": {"version": 1}},
+                {"version": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            return doc["version"]
+        except Exception as e:
+            logger.error(f"Error bumping {self.key} version: {e}", exc_info=True)
+            return None
+
+    def current(self) -> int:
+        doc = self.collection.find_one({"_id": self.key}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    async def current_async(self) -> int:
+        doc = await self.async_collection.find_one({"_id": self.key}, {"version": 1})
+        return doc["version"] if doc else 0
@@ -0,0 +1,297 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Counter:
+    """
+    Contador monotono con etiquetas opcionales
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self, series=None):
+        series = self.collect() if series is None else series
+        for labelvalues, value in series.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}"
+
+
+class Gauge:
+    """
+    Valor instantaneo. Si recibe una funcion, se evalua al exportar.
+    Entre workers se suman los procesos vivos ("livesum") o se exporta
+    uno por proceso con la etiqueta pid ("liveall", para ratios).
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), func=None, multiprocess_mode="livesum"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.multiprocess_mode = multiprocess_mode
+        self._func = func
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def inc(self, amount: float = 1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, amount: float = 1, *labelvalues):
+        self.inc(-amount, *labelvalues)
+
+    def collect(self) -> dict:
+        if self._func is not None:
+            return {(): self._func()}
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self, series=None):
+        series = self.collect() if series is None else series
+        for labelvalues, value in series.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}"
+
+
+class Histogram:
+    """
+    Histograma acumulativo al estilo Prometheus (buckets, suma y conteo)
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # [conteo por bucket..., +Inf, suma]
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> dict:
+        with self._lock:
+            return {labels: list(series) for labels, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self, series=None):
+        series = self.collect() if series is None else series
+        for labelvalues, counts in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, ("le", bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {counts[-1]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Registro de metricas del proceso, exportable en formato de texto de Prometheus.
+    Con enable_multiprocess cada worker vuelca su copia en un directorio compartido
+    y render() agrega las de todos, asi /metrics no depende del worker que responde.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._flush_seconds = 1.0
+        self._flusher_pid = None
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), func=None, multiprocess_mode="livesum"):
+        return self._register(Gauge, name, documentation, labelnames, func, multiprocess_mode)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def _registered(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    # --- Agregacion entre workers ---
+
+    def enable_multiprocess(self, directory: str, flush_seconds: float = 1.0):
+        """
+        Cada proceso escribe <directory>/<pid>.json cada flush_seconds (y al salir).
+        El directorio debe vaciarse al desplegar, antes de arrancar gunicorn.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._flush_seconds = flush_seconds
+
+    def ensure_flusher(self):
+        """
+        Arranca el volcado periodico en este proceso. Tras un fork descarta los
+        valores heredados del padre para no contarlos dos veces.
+        """
+        if self._directory is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            forked = self._flusher_pid is not None
+            self._flusher_pid = os.getpid()
+        if forked:
+            for metric in self._registered():
+                metric.reset()
+        atexit.register(self.flush)
+        threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self._flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """
+        Vuelca los valores de este proceso (escritura atomica)
+        """
+        if self._directory is None:
+            return
+        data = {
+            metric.name: [[list(labels), value] for labels, value in metric.collect().items()]
+            for metric in self._registered()
+        }
+        path = os.path.join(self._directory, f"{os.getpid()}.json")
+        try:
+            with open(path + ".tmp", "w") as fh:
+                json.dump(data, fh)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            logger.error(f"Error writing metrics to {path}: {e}")
+
+    def _merged(self, metrics) -> dict:
+        """
+        Suma contadores e histogramas de todos los ficheros (tambien de workers ya
+        reciclados, para que sigan siendo monotonos); los gauges solo de procesos vivos
+        """
+        merged = {metric.name: {} for metric in metrics}
+        by_name = {metric.name: metric for metric in metrics}
+        for path in glob.glob(os.path.join(self._directory, "*.json")):
+            try:
+                pid = int(os.path.basename(path)[:-len(".json")])
+                with open(path) as fh:
+                    data = json.load(fh)
+            except (ValueError, OSError):
+                continue
+            alive = None
+            for name, entries in data.items():
+                metric = by_name.get(name)
+                if metric is None:
+                    continue
+                if metric.kind == "gauge":
+                    alive = _pid_alive(pid) if alive is None else alive
+                    if not alive:
+                        continue
+                series = merged[name]
+                for labels, value in entries:
+                    labels = tuple(labels)
+                    if metric.kind == "gauge" and metric.multiprocess_mode == "liveall":
+                        series[labels + (str(pid),)] = value
+                    elif metric.kind == "histogram":
+                        current = series.get(labels)
+                        series[labels] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        series[labels] = series.get(labels, 0) + value
+        return merged
+
+    def render(self) -> str:
+        metrics = self._registered()
+        merged = None
+        if self._directory is not None:
+            self.ensure_flusher()
+            self.flush()
+            merged = self._merged(metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if merged is None:
+                lines.extend(metric.samples())
+            elif metric.kind == "gauge" and metric.multiprocess_mode == "liveall":
+                labelnames = metric.labelnames + ("pid",)
+                for labels, value in merged[metric.name].items():
+                    lines.append(f"{metric.name}{_format_labels(labelnames, labels)} {value}")
+            else:
+                lines.extend(metric.samples(merged[metric.name]))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
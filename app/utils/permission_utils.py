@@ -1,32 +1,100 @@
-class RolePermissions:
-    @staticmethod
-    def can_delete_user(current_role: str, target_role: str) -> bool:
-        if current_role == "master" and target_role in ["admin", "master"]:
-            return True
-        if current_role == "admin" and target_role == "user":
-            return True
-        return False
+import json
 
-    @staticmethod
-    def can_update_user(current_role: str, target_role: str) -> bool:
-        if current_role == "master" and target_role in ["admin", "master"]:
-            return True
-        if current_role == "admin" and target_role in ["user", "admin"]:
-            return True
-        return False
+from app.config.app_config import Config, DEFAULT_ROLE_POLICY
+
+
+class RolePolicy:
+    """
+    Politica de permisos compilada una sola vez: por cada accion, el frozenset de
+    pares (rol actual, rol objetivo) permitidos, del que sale la tabla de cada
+    checker; y la tupla ordenada de roles objetivo para derivar consultas.
+    """
+
+    def __init__(self, rules: dict):
+        self._pairs = {
+            action: frozenset(
+                (role, target_role)
+                for role, target_roles in by_role.items()
+                for target_role in target_roles
+            )
+            for action, by_role in rules.items()
+        }
+        self._roles = frozenset(role for pair in set().union(*self._pairs.values()) for role in pair)
+        self._targets = {
+            (action, role): tuple(dict.fromkeys(target_roles))
+            for action, by_role in rules.items()
+            for role, target_roles in by_role.items()
+        }
+
+    def allows(self, action: str, current_role: str, target_role: str) -> bool:
+        try:
+            return (current_role, target_role) in self._pairs.get(action, ())
+        except TypeError:
+            return False
+
+    def checker(self, action: str):
+        """
+        Devuelve la funcion de comprobacion de una accion. Los pares se expanden a una
+        tabla densa rol -> rol -> bool sobre los roles de la politica: dos accesos a
+        dict sin crear la tupla del par en cada llamada.
+        """
+        pairs = self._pairs.get(action, frozenset())
+        table = {
+            current_role: {target_role: (current_role, target_role) in pairs for target_role in self._roles}
+            for current_role in self._roles
+        }
+
+        def check(current_role: str, target_role: str) -> bool:
+            try:
+                return table[current_role][target_role]
+            except (KeyError, TypeError):
+                # Rol desconocido o no hashable (p. ej. una lista en el JSON de entrada)
+                return False
+
+        return check
+
+    def targets(self, action: str, current_role: str) -> tuple:
+        """
+        Roles sobre los que el rol actual puede ejecutar la accion
+        """
+        return self._targets.get((action, current_role), ())
+
+
+def load_role_policy(path: str = None) -> RolePolicy:
+    """
+    Carga la politica desde ROLE_POLICY_FILE o usa la politica por defecto
+    """
+    if not path:
+        return RolePolicy(DEFAULT_ROLE_POLICY)
+    with open(path, encoding="utf-8") as policy_file:
+        return RolePolicy(json.load(policy_file))
+
+
+policy = load_role_policy(Config.ROLE_POLICY_FILE)
+
+
+class RolePermissions:
+    can_delete_user = staticmethod(policy.checker("delete"))
+    can_update_user = staticmethod(policy.checker("update"))
+    can_create_user = staticmethod(policy.checker("create"))
+    can_assign_role = staticmethod(policy.checker("assign"))
 
     @staticmethod
-    def can_create_user(current_role: str, target_role: str) -> bool:
-        if current_role == "master" and target_role == "admin":
-            return True
-        if current_role == "admin" and target_role == "user":
-            return True
-        return False
+    def visible_roles(current_role: str) -> list:
+        """
+        Roles de los usuarios que el rol actual puede listar
+        """
+        return list(policy.targets("view", current_role))
 
     @staticmethod
-    def can_assign_role(current_role: str, target_role: str) -> bool:
-        if current_role == "master" and target_role in ["admin", "master"]:
-            return True
-        if current_role == "admin" and target_role in ["user", "admin"]:
-            return True
-        return False
+    def visibility_filter(current_role: str):
+        """
+        Filtro de MongoDB con los roles visibles para el rol actual.
+        Devuelve None si el rol no puede ver a ningun usuario.
+        """
+        roles = policy.targets("view", current_role)
+        if not roles:
+            return None
+        if len(roles) == 1:
+            return {"role": roles[0]}
+        return {"role": {"$in": list(roles)}}
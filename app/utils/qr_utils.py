@@ -0,0 +1,92 @@
+import io
+from functools import lru_cache
+
+# qrcode y PIL se importan al renderizar el primer QR, no al arrancar el worker
+
+QR_FORMATS = {"png", "svg"}
+MIMETYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+@lru_cache(maxsize=64)
+def _version_for_length(length: int) -> int:
+    """
+    Version minima del QR para un payload en modo byte de esta longitud.
+    Los tokens JWT tienen casi siempre la misma longitud, asi que la busqueda
+    de best_fit se hace una sola vez por longitud.
+    """
+    import qrcode
+    from qrcode.util import QRData, MODE_8BIT_BYTE
+
+    qr = qrcode.QRCode(version=None)
+    qr.add_data(QRData(b"0" * length, mode=MODE_8BIT_BYTE))
+    return qr.best_fit()
+
+
+def build_matrix(data: str, border: int = 5, mask_pattern=None):
+    """
+    Devuelve la matriz del QR (incluye el borde) como lista de filas de booleanos
+    """
+    import qrcode
+    from qrcode.util import QRData, MODE_8BIT_BYTE
+
+    payload = data.encode()
+    qr = qrcode.QRCode(
+        version=_version_for_length(len(payload)),
+        border=border,
+        mask_pattern=mask_pattern,
+    )
+    qr.add_data(QRData(payload, mode=MODE_8BIT_BYTE))
+    qr.make(fit=False)
+    return qr.get_matrix()
+
+
+def render_png(matrix, box_size: int = 10) -> bytes:
+    """
+    PNG de 1 bit por pixel: un pixel por modulo escalado con NEAREST.
+    Sin optimize: ahorra ~6% de bytes pero duplica el tiempo de codificacion.
+    """
+    from PIL import Image
+
+    size = len(matrix)
+    img = Image.new("1", (size, size), 255)
+    img.putdata([0 if dark else 255 for row in matrix for dark in row])
+    if box_size > 1:
+        img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+    buffered = io.BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def render_svg(matrix, box_size: int = 10) -> bytes:
+    """
+    SVG con un unico path; cada tramo horizontal de modulos oscuros es un rectangulo
+    """
+    size = len(matrix)
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            parts.append(f"M{start},{y}h{x - start}v1h-{x - start}z")
+    pixels = size * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path fill="#000" d="{"".join(parts)}"/></svg>'
+    ).encode()
+
+
+def render_qr(data: str, fmt: str = "png", box_size: int = 10, border: int = 5, mask_pattern=None):
+    """
+    Genera la imagen del QR en el formato pedido. Devuelve (bytes, mimetype).
+    """
+    matrix = build_matrix(data, border=border, mask_pattern=mask_pattern)
+    if fmt == "svg":
+        return render_svg(matrix, box_size), MIMETYPES["svg"]
+    return render_png(matrix, box_size), MIMETYPES["png"]
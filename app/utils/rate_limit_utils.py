@@ -0,0 +1,49 @@
+from flask import current_app, request
+from flask_limiter.util import get_remote_address
+
+from app.extensions import limiter
+
+
+def login_email_key() -> str:
+    """
+    Clave por email para /auth/login (normalizado); sin email se usa la IP
+    """
+    data = request.get_json(silent=True) or {}
+    email = data.get("email")
+    if not isinstance(email, str) or not email.strip():
+        return f"ip:{get_remote_address()}"
+    return f"email:{email.strip().lower()}"
+
+
+def device_key() -> str:
+    """
+    Clave por lector de QR (cabecera X-Device-Id); sin cabecera se usa la IP
+    """
+    device_id = request.headers.get("X-Device-Id")
+    if device_id:
+        return f"device:{device_id}"
+    return f"ip:{get_remote_address()}"
+
+
+def config_limit(key: str):
+    """
+    Limite leido de la configuracion de la app en cada peticion (p. ej. "10/minute")
+    """
+    return lambda: current_app.config[key]
+
+
+def limit_login(view):
+    """
+    Ventanas deslizantes por IP y por email, evaluadas antes de llegar a la vista
+    """
+    view = limiter.limit(config_limit("LOGIN_RATE_LIMIT_IP"), key_func=get_remote_address)(view)
+    return limiter.limit(config_limit("LOGIN_RATE_LIMIT_EMAIL"), key_func=login_email_key)(view)
+
+
+def limit_qr(view, prefix: str = "QR"):
+    """
+    Limite por lector y, encima, por IP: X-Device-Id lo elige el cliente, asi que
+    rotarlo no basta para saltarse el limite. Lee <prefix>_RATE_LIMIT_DEVICE/_IP.
+    """
+    view = limiter.limit(config_limit(f"{prefix}_RATE_LIMIT_IP"), key_func=get_remote_address)(view)
+    return limiter.limit(config_limit(f"{prefix}_RATE_LIMIT_DEVICE"), key_func=device_key)(view)
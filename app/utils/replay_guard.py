@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+
+class TimeBucketedReplayStore:
+    """
+    Registro de jti ya usados agrupados por ventana de expiracion.
+    check_and_set es O(1): el mismo jti siempre cae en el bucket de su exp,
+    y los buckets completos se descartan cuando todos sus tokens han expirado.
+    """
+
+    def __init__(self, bucket_seconds: int = 60):
+        self.bucket_seconds = bucket_seconds
+        self._buckets = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def check_and_set(self, jti: str, exp: float) -> bool:
+        """
+        Marca el jti como usado. Devuelve False si ya estaba usado (replay).
+        """
+        bucket = int(exp // self.bucket_seconds)
+        with self._lock:
+            self._evict(time.time())
+            used = self._buckets.get(bucket)
+            if used is None:
+                used = self._buckets[bucket] = set()
+                if self._oldest is None or bucket < self._oldest:
+                    self._oldest = bucket
+            elif jti in used:
+                return False
+            used.add(jti)
+            return True
+
+    def size(self) -> int:
+        with self._lock:
+            return sum(len(used) for used in self._buckets.values())
+
+    def _evict(self, now: float):
+        current = int(now // self.bucket_seconds)
+        if self._oldest is None or self._oldest >= current:
+            return
+        for bucket in [b for b in self._buckets if b < current]:
+            del self._buckets[bucket]
+        self._oldest = min(self._buckets) if self._buckets else None
+
+
+class ReplayGuardManager(BaseManager):
+    pass
+
+
+class ManagerReplayStore:
+    """
+    Cliente del store compartido servido por un proceso local (ver serve_replay_store).
+    La conexion se abre de forma perezosa y se rehace tras un fork.
+    """
+
+    def __init__(self, address, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._store = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _proxy(self):
+        if self._store is None or self._pid != os.getpid():
+            with self._lock:
+                if self._store is None or self._pid != os.getpid():
+                    ReplayGuardManager.register("get_store")
+                    manager = ReplayGuardManager(address=self.address, authkey=self.authkey)
+                    manager.connect()
+                    self._store = manager.get_store()
+                    self._pid = os.getpid()
+        return self._store
+
+    def check_and_set(self, jti: str, exp: float) -> bool:
+        return self._proxy().check_and_set(jti, exp)
+
+    def size(self) -> int:
+        return self._proxy().size()
+
+
+def require_authkey(authkey) -> bytes:
+    """
+    Clave del manager como bytes; sin clave no se arranca (el protocolo usa pickle)
+    """
+    if not authkey:
+        raise ValueError("QR_REPLAY_AUTHKEY es obligatoria con QR_REPLAY_BACKEND=manager")
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def serve_replay_store(address, authkey: bytes, bucket_seconds: int = 60):
+    """
+    Sirve un TimeBucketedReplayStore compartido por los workers de gunicorn
+    """
+    authkey = require_authkey(authkey)
+    store = TimeBucketedReplayStore(bucket_seconds)
+    ReplayGuardManager.register("get_store", callable=lambda: store)
+    manager = ReplayGuardManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    server.serve_forever()
+
+
+def parse_address(value: str):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def create_replay_store(backend: str, address: str, authkey, bucket_seconds: int = 60):
+    """
+    Crea el backend configurado: "memory" (por proceso) o "manager" (compartido,
+    exige authkey)
+    """
+    if backend == "manager":
+        return ManagerReplayStore(parse_address(address), require_authkey(authkey))
+    if backend == "memory":
+        return TimeBucketedReplayStore(bucket_seconds)
+    raise ValueError(f"Backend de replay desconocido: {backend}")
@@ -0,0 +1,41 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Tiempo acumulado por componente (db, hash, jwt, qr_render, serialization)
+# de la peticion en curso. None fuera de una peticion.
+_breakdown = contextvars.ContextVar("request_timing", default=None)
+
+
+def start_request() -> dict:
+    """
+    Abre el desglose de la peticion actual. El dict se comparte por referencia
+    con las tareas que copian el contexto (vistas async).
+    """
+    breakdown = {}
+    _breakdown.set(breakdown)
+    return breakdown
+
+
+def finish_request() -> dict:
+    breakdown = _breakdown.get()
+    _breakdown.set(None)
+    return breakdown or {}
+
+
+def record(component: str, seconds: float):
+    """
+    Suma tiempo al componente en la peticion actual; no hace nada fuera de una peticion
+    """
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown[component] = breakdown.get(component, 0.0) + seconds
+
+
+@contextmanager
+def timed(component: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(component, time.perf_counter() - started)
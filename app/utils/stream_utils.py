@@ -0,0 +1,37 @@
+from flask import Response, stream_with_context
+
+STREAM_FORMATS = {"ndjson", "json"}
+
+
+def ndjson_lines(items, dumps):
+    """
+    Genera una linea JSON por documento (application/x-ndjson)
+    """
+    for item in items:
+        yield dumps(item) + "\n"
+
+
+def json_array_chunks(items, dumps):
+    """
+    Genera un array JSON por partes: '[', elementos separados por ',' y ']'
+    """
+    yield "["
+    first = True
+    for item in items:
+        if first:
+            first = False
+            yield dumps(item)
+        else:
+            yield "," + dumps(item)
+    yield "]"
+
+
+def stream_response(items, stream_format: str, dumps) -> Response:
+    """
+    Construye una respuesta chunked a partir de un iterable, en memoria constante
+    """
+    if stream_format == "ndjson":
+        body, mimetype = ndjson_lines(items, dumps), "application/x-ndjson"
+    else:
+        body, mimetype = json_array_chunks(items, dumps), "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype)
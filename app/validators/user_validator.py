@@ -1,85 +1,215 @@
 import re
+from typing import Callable, NamedTuple
+
+# ---------------------------
+# Reglas compiladas una sola vez
+# ---------------------------
+DOCUMENT_PATTERN = re.compile(r"^[0-9]{6,15}$")
+NAME_PATTERN = re.compile(r"^[a-zA-Z]+$")
+EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})*$")
+PHONE_PATTERN = re.compile(r"^[0-9]{7,15}$")
+PASSWORD_PATTERN = re.compile(r"^(?=.*[a-z])(?=.*[A-Z])(?=.*[0-9])(?=.*[@$!%*?&])[A-Za-z0-9@$!%*?&]{8,}$")
+
+DOCUMENT_TYPES = frozenset({"CC", "TI", "CE", "PA", "RC", "NUIP", "PEP", "PPT", "NIT"})
+ROLES = frozenset({"admin", "master", "user"})
+
+
+def _is_present(value) -> bool:
+    return isinstance(value, str) and value.strip() != ""
+
+def _check_document(value) -> bool:
+    return _is_present(value) and DOCUMENT_PATTERN.match(value) is not None
+
+def _check_document_type(value) -> bool:
+    return _is_present(value) and value in DOCUMENT_TYPES
+
+def _check_role(value) -> bool:
+    return _is_present(value) and value in ROLES
+
+def _check_name(value) -> bool:
+    return isinstance(value, str) and NAME_PATTERN.match(value) is not None
+
+def _check_email(value) -> bool:
+    return _is_present(value) and EMAIL_PATTERN.match(value) is not None
+
+def _check_phone(value) -> bool:
+    return PHONE_PATTERN.match(str(value)) is not None
+
+def _check_password(value) -> bool:
+    return _is_present(value) and PASSWORD_PATTERN.match(value) is not None
+
+def _check_re_password(password, re_password) -> bool:
+    return isinstance(password, str) and password == re_password
+
+
+class Rule(NamedTuple):
+    """
+    Regla de validacion: campos que lee, clave y mensaje del error y predicado
+    """
+    fields: tuple
+    error_key: str
+    message: str
+    check: Callable
+
+
+class ValidationSchema:
+    """
+    Conjunto de reglas compilado una vez. Con partial=True solo se evaluan
+    las reglas cuyos campos vienen en el payload (actualizaciones).
+    """
+
+    def __init__(self, rules, partial: bool = False):
+        self.rules = tuple(rules)
+        self.partial = partial
+        # Cada regla queda como (campo, segundo campo o None, clave, mensaje, predicado)
+        self._compiled = tuple(
+            (rule.fields[0], rule.fields[1] if len(rule.fields) > 1 else None,
+             rule.error_key, rule.message, rule.check)
+            for rule in self.rules
+        )
+
+    def validate(self, data: dict) -> dict:
+        errors = {}
+        get = data.get
+        partial = self.partial
+        for field, other, error_key, message, check in self._compiled:
+            if partial and field not in data:
+                continue
+            if error_key in errors:
+                continue
+            valid = check(get(field)) if other is None else check(get(field), get(other))
+            if not valid:
+                errors[error_key] = message
+        return errors
+
+
+CREATE_USER_SCHEMA = ValidationSchema([
+    Rule(("document",), "document", "Invalid document format", _check_document),
+    Rule(("document_type",), "document_type", "Invalid document type", _check_document_type),
+    Rule(("name",), "name", "Invalid name format", _check_name),
+    Rule(("last_name1",), "last_names", "Invalid last names format", _check_name),
+    Rule(("last_name2",), "last_names", "Invalid last names format", _check_name),
+    Rule(("email",), "email", "Invalid email format", _check_email),
+    Rule(("phone",), "phone", "Invalid phone format", _check_phone),
+    Rule(("password",), "password", "Invalid password format", _check_password),
+    Rule(("password", "re_password"), "re_password", "Passwords do not match", _check_re_password),
+])
+
+UPDATE_USER_SCHEMA = ValidationSchema([
+    Rule(("name",), "name", "Invalid name format", _check_name),
+    Rule(("last_name1",), "last_name1", "Invalid last name format", _check_name),
+    Rule(("last_name2",), "last_name2", "Invalid last name format", _check_name),
+    Rule(("phone",), "phone", "Invalid phone format", _check_phone),
+    Rule(("email",), "email", "Invalid email format", _check_email),
+    Rule(("password",), "password", "Invalid password format", _check_password),
+], partial=True)
+
 
 class UserValidator:
     def __init__(self, collection):
         self.collection = collection
 
     # ---------------------------
-    # Utilidades
+    # Validacion completa
     # ---------------------------
-    def _match_pattern(self, pattern: str, value: str) -> bool:
-        if not isinstance(value, str):
-            return False
-        return re.match(pattern, value) is not None
+    def validate(self, data: dict, schema: ValidationSchema = CREATE_USER_SCHEMA) -> dict:
+        """
+        Valida el payload en una sola pasada y devuelve {campo: error}
+        """
+        return schema.validate(data)
 
+    # ---------------------------
+    # Utilidades
+    # ---------------------------
     def is_present(self, value):
-        return isinstance(value, str) and value.strip() != ""
+        return _is_present(value)
 
     # ---------------------------
     # Document (_id en MongoDB)
     # ---------------------------
     def is_valid_document(self, document) -> bool:
-        if not self.is_present(document):
-            return False
-        pattern = r"^[0-9]{6,15}$"
-        return self._match_pattern(pattern, str(document))
+        return _check_document(document)
 
     def is_document_registered(self, document: str) -> bool:
-        return self.collection.find_one({"_id": str(document)}) is not None
+        return self.collection.find_one({"_id": str(document)}, {"_id": 1}) is not None
 
     # ---------------------------
     # Document Type
     # ---------------------------
     def is_valid_document_type(self, document_type) -> bool:
-        if not self.is_present(document_type):
-            return False
-        valid_types = {"CC", "TI", "CE", "PA", "RC", "NUIP", "PEP", "PPT", "NIT"}
-        return document_type in valid_types
+        return _check_document_type(document_type)
 
     # ---------------------------
     # Role
     # ---------------------------
     def is_valid_role(self, role) -> bool:
-        if not self.is_present(role):
-            return False
-        return role in {"admin", "master", "user"}
+        return _check_role(role)
 
     # ---------------------------
     # Name y Last Names
     # ---------------------------
     def is_valid_name_and_last_name(self, name) -> bool:
-        pattern = r"^[a-zA-Z]+$"
-        return self._match_pattern(pattern, name)
+        return _check_name(name)
+
+    def is_valid_name(self, name) -> bool:
+        return _check_name(name)
+
+    def is_valid_last_name(self, last_name) -> bool:
+        return _check_name(last_name)
 
     # ---------------------------
     # Email
     # ---------------------------
     def is_valid_email(self, email) -> bool:
-        if not self.is_present(email):
-            return False
-        pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})*$"
-        return self._match_pattern(pattern, email)
+        return _check_email(email)
 
     def is_email_registered(self, email: str) -> bool:
-        return self.collection.find_one({"email": email}) is not None
+        return self.collection.find_one({"email": email}, {"_id": 1}) is not None
+
+    # ---------------------------
+    # Conflictos (document + email)
+    # ---------------------------
+    def find_conflicts(self, document, email) -> dict:
+        """
+        Busca documento y email ya registrados con una sola consulta $or
+        sobre _id y el indice unico de email, proyectando _id y email.
+        Un mismo usuario puede coincidir en ambos campos.
+        """
+        document = str(document)
+        conflicts = {}
+        cursor = self.collection.find(
+            {"$or": [{"_id": document}, {"email": email}]},
+            {"_id": 1, "email": 1},
+        ).limit(2)
+        for doc in cursor:
+            if doc["_id"] == document:
+                conflicts["document"] = "Document already registered"
+            if email is not None and doc.get("email") == email:
+                conflicts["email"] = "Email already registered"
+        return conflicts
+
+    @staticmethod
+    def duplicate_key_conflicts(details: dict) -> dict:
+        """
+        Traduce los detalles de un error de clave duplicada (11000) de MongoDB
+        al mismo formato de conflictos
+        """
+        key_pattern = (details or {}).get("keyPattern") or {}
+        if "email" in key_pattern:
+            return {"email": "Email already registered"}
+        return {"document": "Document already registered"}
 
     # ---------------------------
     # Phone
     # ---------------------------
     def is_valid_phone(self, phone) -> bool:
-        if not self.is_present(str(phone)):
-            return False
-        pattern = r"^[0-9]{7,15}$"
-        return self._match_pattern(pattern, str(phone))
+        return _check_phone(phone)
 
     # ---------------------------
     # Password
     # ---------------------------
     def is_valid_password(self, password) -> bool:
-        if not self.is_present(password):
-            return False
-        pattern = r"^(?=.*[a-z])(?=.*[A-Z])(?=.*[0-9])(?=.*[@$!%*?&])[A-Za-z0-9@$!%*?&]{8,}$"
-        return self._match_pattern(pattern, password)
+        return _check_password(password)
 
     def is_valid_re_password(self, password, re_password) -> bool:
-        return isinstance(password, str) and password == re_password
+        return _check_re_password(password, re_password)
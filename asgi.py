@@ -0,0 +1,30 @@
+import os
+
+# Las rutas eligen sus vistas async al importarse, antes de crear la app
+os.environ.setdefault("SERVING_MODE", "async")
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+from app.config.app_config import Config
+
+app = create_app()
+
+# Las peticiones entran por ASGI y se atienden en un pool de hilos; las vistas async
+# (MongoDB async, Argon2 y QR en executors) corren en el event loop compartido.
+#
+# Limitaciones:
+# - Solo tienen version async POST /auth/login, GET /users, GET /qr/generate-qr y
+#   POST /qr/validate (las rutas calientes). Las escrituras (POST/PUT/DELETE /users,
+#   POST /users/bulk, que solo encola el trabajo), POST /qr/validate-batch y
+#   POST /auth/refresh siguen siendo vistas sync con PyMongo sync: ocupan un hilo
+#   del pool durante toda la peticion, igual que con gunicorn -k gthread.
+# - Flask es WSGI: tambien una vista async ocupa su hilo mientras espera a la
+#   corrutina (BackgroundLoop.run). Las peticiones en curso estan acotadas por
+#   ASGI_WSGI_THREADS en ambos casos; el loop solo evita que cada una tenga
+#   ademas su propia conexion y su propio loop.
+asgi_app = WSGIMiddleware(app, workers=Config.ASGI_WSGI_THREADS)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(asgi_app, host="0.0.0.0", port=5000)
@@ -0,0 +1,49 @@
+"""
+Benchmark del filtro de emails registrados usado en el login.
+
+Mide el tamaño del filtro, consultas por segundo y la tasa real de falsos
+positivos con emails que no estan registrados.
+
+Uso:
+    python -m benchmarks.bench_email_filter [--users 100000] [--error-rate 0.01]
+"""
+import argparse
+import time
+
+from app.utils.bloom_filter import BloomFilter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    registered = [f"user{i}@example.com" for i in range(args.users)]
+    unknown = [f"nobody{i}@example.com" for i in range(args.lookups)]
+
+    start = time.perf_counter()
+    bloom = BloomFilter(int(args.users * 1.25) + 1000, args.error_rate)
+    for email in registered:
+        bloom.add(email)
+    build = time.perf_counter() - start
+
+    missing = [email for email in registered if not bloom.might_contain(email)]
+    if missing:
+        print(f"FALSOS NEGATIVOS: {len(missing)}")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    false_positives = sum(1 for email in unknown if bloom.might_contain(email))
+    elapsed = time.perf_counter() - start
+
+    print(f"usuarios          {args.users}")
+    print(f"tamaño            {bloom.size_bytes() / 1024:.1f} KiB, {bloom.num_hashes} hashes")
+    print(f"construccion      {build * 1000:.1f} ms")
+    print(f"consultas/s       {args.lookups / elapsed:.0f}")
+    print(f"falsos positivos  {false_positives / args.lookups:.4%}")
+
+
+if __name__ == "__main__":
+    main()
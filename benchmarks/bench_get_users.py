@@ -0,0 +1,84 @@
+"""
+Benchmark de GET /users: documentos examinados y devueltos segun el tamaño de la coleccion.
+
+Compara el camino anterior (find({}) y filtrado en Python) con el filtro por rol
+resuelto en MongoDB sobre el indice role_1.
+
+Uso:
+    python -m benchmarks.bench_get_users [--sizes 1000 10000 100000] [--role admin]
+
+Usa una base de datos separada (<DB_NAME>_bench) que se borra al terminar.
+"""
+import argparse
+import time
+
+from pymongo import ASCENDING, MongoClient
+
+from app.config.app_config import Config
+from app.utils.permission_utils import RolePermissions
+from app.services.user_service import USER_PUBLIC_PROJECTION
+
+ROLE_DISTRIBUTION = (("user", 0.90), ("admin", 0.09), ("master", 0.01))
+
+
+def seed(collection, size):
+    collection.drop()
+    docs = []
+    for role, ratio in ROLE_DISTRIBUTION:
+        for i in range(int(size * ratio)):
+            docs.append({
+                "_id": f"{role}-{i}",
+                "role": role,
+                "name": "Bench",
+                "email": f"{role}{i}@bench.test",
+                "password": "$argon2id$v=19$m=65536,t=3,p=2$" + "x" * 64,
+            })
+    collection.insert_many(docs, ordered=False)
+    collection.create_index([("role", ASCENDING)], name="role_1")
+
+
+def run_legacy(collection, current_role):
+    visible = set(RolePermissions.visible_roles(current_role))
+    stats = collection.find({}).explain()["executionStats"]
+    start = time.perf_counter()
+    returned = 0
+    for doc in collection.find({}):
+        if doc.get("role", "").lower() in visible:
+            doc.pop("password", None)
+            returned += 1
+    elapsed = time.perf_counter() - start
+    return stats["totalDocsExamined"], stats["nReturned"], returned, elapsed
+
+
+def run_filtered(collection, current_role):
+    query = RolePermissions.visibility_filter(current_role)
+    stats = collection.find(query, USER_PUBLIC_PROJECTION).explain()["executionStats"]
+    start = time.perf_counter()
+    returned = sum(1 for _ in collection.find(query, USER_PUBLIC_PROJECTION))
+    elapsed = time.perf_counter() - start
+    return stats["totalDocsExamined"], stats["nReturned"], returned, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--role", default="admin", choices=["admin", "master"])
+    args = parser.parse_args()
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[f"{Config.DB_NAME}_bench"]
+    collection = db["users"]
+
+    print(f"{'size':>8} {'mode':>9} {'examined':>9} {'sent':>8} {'kept':>8} {'ms':>9}")
+    try:
+        for size in args.sizes:
+            seed(collection, size)
+            for mode, runner in (("legacy", run_legacy), ("filtered", run_filtered)):
+                examined, sent, kept, elapsed = runner(collection, args.role)
+                print(f"{size:>8} {mode:>9} {examined:>9} {sent:>8} {kept:>8} {elapsed * 1000:>9.1f}")
+    finally:
+        client.drop_database(db.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de serializacion JSON de respuestas: 10k documentos de usuario.
+
+Compara el jsonify anterior (JSONIFY_PRETTYPRINT_REGULAR: indentado y claves
+ordenadas) con AppJSONProvider en modo compacto, con la stdlib y con orjson
+si esta instalado. Reporta tiempo por respuesta y bytes.
+
+Uso:
+    python -m benchmarks.bench_json [--users 10000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from flask import Flask
+
+from app.extensions.json_provider import AppJSONProvider, orjson
+
+
+def make_users(count):
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "_id": str(1000000000 + i),
+            "document_type": "CC",
+            "role": "user",
+            "name": "María José",
+            "last_name1": "Gómez",
+            "last_name2": "Arias",
+            "email": f"user{i}@example.com",
+            "phone": "3001234567",
+            "ref": ObjectId(),
+            "created_at": created,
+        }
+        for i in range(count)
+    ]
+
+
+def provider(encoder, pretty):
+    app = Flask(__name__)
+    app.config.update(JSON_ENCODER=encoder, JSON_PRETTY=pretty)
+    return AppJSONProvider(app)
+
+
+def run(name, encode, payload, repeat):
+    body = encode(payload)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:<16} {elapsed * 1000:>10.2f} {len(body) / 1024:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = make_users(args.users)
+    legacy = provider("json", True)
+
+    print(f"{'mode':<16} {'ms/resp':>10} {'KiB':>10}")
+    # Equivalente al jsonify anterior: indent=2, sort_keys, ensure_ascii
+    run("legacy-pretty", lambda obj: json.dumps(obj, indent=2, sort_keys=True, default=legacy.default).encode(),
+        payload, args.repeat)
+    run("compact-json", provider("json", False)._encode, payload, args.repeat)
+    if orjson is not None:
+        run("compact-orjson", provider("orjson", False)._encode, payload, args.repeat)
+    else:
+        print("orjson no instalado: se omite compact-orjson")
+
+
+if __name__ == "__main__":
+    main()
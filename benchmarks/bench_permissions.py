@@ -0,0 +1,109 @@
+"""
+Benchmark de comprobaciones de permisos por segundo y verificacion de consistencia.
+
+Compara las cadenas de if originales de RolePermissions con la politica compilada
+y comprueba que ambas den el mismo resultado para todas las combinaciones de roles.
+
+Uso:
+    python -m benchmarks.bench_permissions [--iterations 1000000] [--rounds 5]
+"""
+import argparse
+import itertools
+import time
+
+from app.utils.permission_utils import RolePermissions
+
+ROLES = ["master", "admin", "user", "guest", "", None]
+
+
+class LegacyRolePermissions:
+    @staticmethod
+    def can_delete_user(current_role, target_role):
+        if current_role == "master" and target_role in ["admin", "master"]:
+            return True
+        if current_role == "admin" and target_role == "user":
+            return True
+        return False
+
+    @staticmethod
+    def can_update_user(current_role, target_role):
+        if current_role == "master" and target_role in ["admin", "master"]:
+            return True
+        if current_role == "admin" and target_role in ["user", "admin"]:
+            return True
+        return False
+
+    @staticmethod
+    def can_create_user(current_role, target_role):
+        if current_role == "master" and target_role == "admin":
+            return True
+        if current_role == "admin" and target_role == "user":
+            return True
+        return False
+
+    @staticmethod
+    def can_assign_role(current_role, target_role):
+        if current_role == "master" and target_role in ["admin", "master"]:
+            return True
+        if current_role == "admin" and target_role in ["user", "admin"]:
+            return True
+        return False
+
+    @staticmethod
+    def visible_roles(current_role):
+        # Reglas que get_users aplicaba a mano
+        return {"master": ["admin"], "admin": ["user"]}.get(current_role, [])
+
+
+CHECKS = ["can_delete_user", "can_update_user", "can_create_user", "can_assign_role"]
+
+
+def check_consistency():
+    mismatches = []
+    for name in CHECKS:
+        legacy, compiled = getattr(LegacyRolePermissions, name), getattr(RolePermissions, name)
+        for current_role, target_role in itertools.product(ROLES, ROLES):
+            if legacy(current_role, target_role) != compiled(current_role, target_role):
+                mismatches.append((name, current_role, target_role))
+    for role in ROLES:
+        if LegacyRolePermissions.visible_roles(role) != RolePermissions.visible_roles(role):
+            mismatches.append(("visible_roles", role, None))
+    return mismatches
+
+
+def run(impl, pairs, iterations):
+    checks = [getattr(impl, check) for check in CHECKS]
+    start = time.perf_counter()
+    for i in range(iterations):
+        current_role, target_role = pairs[i % len(pairs)]
+        checks[i & 3](current_role, target_role)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    mismatches = check_consistency()
+    if mismatches:
+        for mismatch in mismatches:
+            print("MISMATCH", *mismatch)
+        raise SystemExit(1)
+    print("Consistencia: OK")
+
+    pairs = list(itertools.product(ROLES[:3], ROLES[:3]))
+    impls = {"legacy": LegacyRolePermissions, "policy": RolePermissions}
+    # Rondas alternadas; se queda la mejor de cada modo para reducir el ruido
+    best = dict.fromkeys(impls, 0.0)
+    for _ in range(args.rounds):
+        for name, impl in impls.items():
+            best[name] = max(best[name], run(impl, pairs, args.iterations))
+    print(f"{'mode':<9} {'checks/s':>14}")
+    for name, rate in best.items():
+        print(f"{name:<9} {rate:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
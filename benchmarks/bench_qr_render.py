@@ -0,0 +1,71 @@
+"""
+Microbenchmark del renderizado de QR: imagenes por segundo y bytes por imagen.
+
+Compara el camino anterior (qrcode.make_image + PNG RGB/L + fit=True) con
+app.utils.qr_utils en PNG de 1 bit (QR_BOX_SIZE, la respuesta base64, y
+QR_RAW_BOX_SIZE, la de ?raw=1) y SVG, con mascara automatica (por defecto) y fija.
+
+Uso:
+    python -m benchmarks.bench_qr_render [--iterations 200] [--token-length 330]
+"""
+import argparse
+import base64
+import io
+import secrets
+import time
+
+import qrcode
+
+from app.config.app_config import Config
+from app.utils.qr_utils import render_qr
+
+
+def legacy_render(token: str) -> bytes:
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(token)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffered = io.BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def fake_token(length: int) -> str:
+    # Un JWT es base64url con dos puntos; la longitud es lo que importa
+    raw = base64.urlsafe_b64encode(secrets.token_bytes(length)).decode()[:length - 2]
+    third = len(raw) // 3
+    return f"{raw[:third]}.{raw[third:2 * third]}.{raw[2 * third:]}"
+
+
+def run(name, render, tokens):
+    render(tokens[0])  # calentamiento (caches de version)
+    total_bytes = 0
+    start = time.perf_counter()
+    for token in tokens:
+        total_bytes += len(render(token))
+    elapsed = time.perf_counter() - start
+    count = len(tokens)
+    print(f"{name:<22} {count / elapsed:>10.1f} {total_bytes / count:>12.0f} "
+          f"{len(base64.b64encode(b'0' * (total_bytes // count))):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--token-length", type=int, default=330)
+    args = parser.parse_args()
+
+    tokens = [fake_token(args.token_length) for _ in range(args.iterations)]
+
+    print(f"{'mode':<22} {'images/s':>10} {'bytes/img':>12} {'base64/img':>12}")
+    run("legacy png", legacy_render, tokens)
+    box, raw_box = Config.QR_BOX_SIZE, Config.QR_RAW_BOX_SIZE
+    run("png 1-bit", lambda t: render_qr(t, "png", box_size=box)[0], tokens)
+    run("png 1-bit raw", lambda t: render_qr(t, "png", box_size=raw_box)[0], tokens)
+    run("png 1-bit raw mask=3", lambda t: render_qr(t, "png", box_size=raw_box, mask_pattern=3)[0], tokens)
+    run("svg", lambda t: render_qr(t, "svg")[0], tokens)
+    run("svg mask=3", lambda t: render_qr(t, "svg", mask_pattern=3)[0], tokens)
+
+
+if __name__ == "__main__":
+    main()
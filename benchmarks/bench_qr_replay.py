@@ -0,0 +1,70 @@
+"""
+Benchmark de validaciones de QR de un solo uso por segundo con escaneos concurrentes.
+
+Cada validacion decodifica el JWT temporal y hace check-and-set del jti en el
+store de replay. Se mide el backend en memoria y, con --manager, el store
+compartido servido por un proceso local (flask --app main replay-guard-server, con la
+misma QR_REPLAY_AUTHKEY en ambos procesos).
+
+Uso:
+    python -m benchmarks.bench_qr_replay [--tokens 20000] [--threads 1 4 16] [--manager]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+from app.auth.jwt_auth import generate_temporary_token, verify_token
+from app.config.app_config import Config
+from app.utils.replay_guard import create_replay_store
+
+
+def build_app():
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "bench-secret"
+    JWTManager(app)
+    return app
+
+
+def run(app, store, tokens, threads):
+    def validate(token):
+        with app.app_context():
+            payload = verify_token(token)
+            return payload is not None and store.check_and_set(payload["jti"], payload["exp"])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # Cada token se escanea dos veces: la segunda debe ser rechazada
+        accepted = sum(executor.map(validate, tokens + tokens, chunksize=256))
+    elapsed = time.perf_counter() - start
+    assert accepted == len(tokens), f"{accepted} aceptados de {len(tokens)}"
+    return 2 * len(tokens) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--manager", action="store_true")
+    args = parser.parse_args()
+
+    app = build_app()
+    with app.app_context():
+        tokens = [generate_temporary_token(f"user-{i}", "user") for i in range(args.tokens)]
+
+    backends = ["memory"] + (["manager"] if args.manager else [])
+    print(f"{'backend':<8} {'threads':>7} {'validations/s':>14}")
+    for backend in backends:
+        for threads in args.threads:
+            store = create_replay_store(backend, Config.QR_REPLAY_ADDRESS, Config.QR_REPLAY_AUTHKEY)
+            if backend == "manager":
+                # El servidor compartido conserva los jti entre corridas
+                with app.app_context():
+                    tokens = [generate_temporary_token(f"user-{i}", "user") for i in range(args.tokens)]
+            print(f"{backend:<8} {threads:>7} {run(app, store, tokens, threads):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
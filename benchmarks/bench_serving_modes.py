@@ -0,0 +1,105 @@
+"""
+Compara peticiones por segundo entre el modo sync y el modo async en un solo nucleo.
+
+Levanta cada servidor fijado a un nucleo y lanza la carga contra el:
+    taskset -c 0 gunicorn -w 1 --threads 32 -b 127.0.0.1:5000 main:app
+    taskset -c 0 env SERVING_MODE=async uvicorn asgi:asgi_app --port 5001
+
+    python -m benchmarks.bench_serving_modes --url http://127.0.0.1:5000/qr/validate --token <qr>
+    python -m benchmarks.bench_serving_modes --url http://127.0.0.1:5001/qr/validate --token <qr>
+
+Con --login EMAIL PASSWORD se mide POST /auth/login en lugar de la validacion de QR.
+Con --add-users ACCESS_TOKEN (de un admin) se mide una escritura, POST /users, con un
+usuario distinto en cada peticion. En modo async es una vista sync (ver asgi.py):
+
+    python -m benchmarks.bench_serving_modes --url http://127.0.0.1:5001/users/ --add-users <token>
+
+El alta incluye un hash Argon2: con ARGON2_TIME_COST/ARGON2_MEMORY_COST bajos se mide
+sobre todo MongoDB y el servidor; con los de produccion, el pool de Argon2.
+"""
+import argparse
+import itertools
+import threading
+import time
+
+import requests
+
+
+def new_user_payload(sequence):
+    """
+    Usuario valido y unico por peticion (documento y email no repetidos)
+    """
+    document = str(next(sequence))
+    return {
+        "document": document,
+        "document_type": "CC",
+        "role": "user",
+        "name": "Bench",
+        "last_name1": "Load",
+        "last_name2": "Test",
+        "email": f"bench-{document}@example.com",
+        "phone": "3000000000",
+        "password": "Bench123*",
+        "re_password": "Bench123*",
+    }
+
+
+def worker(url, make_payload, headers, deadline, counts, lock):
+    session = requests.Session()
+    session.headers.update(headers)
+    ok = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            response = session.post(url, json=make_payload(), timeout=10)
+            if response.status_code < 500:
+                ok += 1
+            else:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+    with lock:
+        counts["ok"] += ok
+        counts["errors"] += errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--token", help="Token de QR para /qr/validate")
+    parser.add_argument("--login", nargs=2, metavar=("EMAIL", "PASSWORD"))
+    parser.add_argument("--add-users", metavar="ACCESS_TOKEN", help="Mide POST /users con este token de admin")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    headers = {}
+    if args.add_users:
+        # Documentos de 13 digitos que no chocan entre ejecuciones
+        sequence = itertools.count(int(time.time()) * 1000)
+        make_payload = lambda: new_user_payload(sequence)
+        headers["Authorization"] = f"Bearer {args.add_users}"
+    elif args.login:
+        payload = {"email": args.login[0], "password": args.login[1]}
+        make_payload = lambda: payload
+    else:
+        payload = {"token": args.token}
+        make_payload = lambda: payload
+
+    counts = {"ok": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(args.url, make_payload, headers, deadline, counts, lock))
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"url={args.url} concurrency={args.concurrency}")
+    print(f"requests/s={counts['ok'] / args.seconds:.1f} errors={counts['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark de arranque en frio: tiempo de `create_app()` en un proceso nuevo y
+desglose de `python -X importtime` por paquete de primer nivel.
+
+Cada medicion lanza un interprete limpio, como un worker nuevo de gunicorn o
+una instancia recien escalada.
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+
+Variables utiles: FLASK_ENV=production, MONGO_ENSURE_INDEXES=off|background|startup.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = (
+    "import time; started = time.perf_counter(); "
+    "from app import create_app; imported = time.perf_counter(); "
+    "create_app(); done = time.perf_counter(); "
+    "print(imported - started, done - imported)"
+)
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_startup(runs: int):
+    imports, factory = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        import_seconds, factory_seconds = map(float, output.split())
+        imports.append(import_seconds)
+        factory.append(factory_seconds)
+    return statistics.median(imports), statistics.median(factory)
+
+
+def importtime_breakdown():
+    """
+    Microsegundos propios (self) de cada import agrupados por paquete de primer nivel
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, _, _, module = match.groups()
+            totals[module.split(".")[0]] += int(self_us)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    import_seconds, factory_seconds = measure_startup(args.runs)
+    print(f"import app    {import_seconds * 1000:>8.1f} ms (mediana de {args.runs})")
+    print(f"create_app()  {factory_seconds * 1000:>8.1f} ms")
+    print()
+    print(f"{'paquete':<24} {'self_ms':>8}")
+    for package, self_us in importtime_breakdown()[:args.top]:
+        print(f"{package:<24} {self_us / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark de la comprobacion de revocacion por peticion (token_in_blocklist_loader).
+
+Mide is_revoked con N jti revocados y N usuarios con "not before", para tokens
+vigentes y revocados. La comprobacion debe quedarse por debajo de 1 µs.
+
+Uso:
+    python -m benchmarks.bench_token_blocklist [--revoked 100000] [--iterations 1000000]
+"""
+import argparse
+import time
+
+from app.services.token_blocklist import TokenBlocklist
+
+
+class EmptyCollection:
+    """
+    Almacen compartido vacio: el benchmark solo mide la consulta en memoria
+    """
+
+    def find(self, *args, **kwargs):
+        return []
+
+
+def run(name, blocklist, claims, iterations):
+    is_revoked = blocklist.is_revoked
+    start = time.perf_counter()
+    for i in range(iterations):
+        is_revoked(claims[i % len(claims)])
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {elapsed / iterations * 1e9:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=1000000)
+    args = parser.parse_args()
+
+    now = time.time()
+    blocklist = TokenBlocklist(EmptyCollection(), sync_seconds=3600, user_ttl=3600)
+    for i in range(args.revoked):
+        blocklist._jtis[f"jti-{i}"] = now + 900
+        blocklist._apply_user(f"user-{i}", now)
+
+    issued_ms = int(now * 1000)
+    valid = [{"jti": f"live-{i}", "sub": f"other-{i}", "iat_ms": issued_ms} for i in range(1000)]
+    revoked_jti = [{"jti": f"jti-{i}", "sub": f"other-{i}", "iat_ms": issued_ms} for i in range(1000)]
+    revoked_user = [{"jti": f"live-{i}", "sub": f"user-{i}", "iat_ms": issued_ms - 60000} for i in range(1000)]
+
+    print(f"{'tokens':<10} {'ns/check':>10}")
+    run("valid", blocklist, valid, args.iterations)
+    run("jti", blocklist, revoked_jti, args.iterations)
+    run("user", blocklist, revoked_user, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
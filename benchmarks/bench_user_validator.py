@@ -0,0 +1,85 @@
+"""
+Benchmark de validaciones de payloads de usuario por segundo.
+
+Compara la validacion campo a campo con patrones en texto (re.match en cada
+llamada, como antes) con el motor de reglas precompiladas de UserValidator.
+
+Uso:
+    python -m benchmarks.bench_user_validator [--iterations 200000]
+"""
+import argparse
+import re
+import time
+
+from app.validators.user_validator import UserValidator, CREATE_USER_SCHEMA
+
+VALID = {
+    "document": "1234567890",
+    "document_type": "CC",
+    "role": "user",
+    "name": "Ana",
+    "last_name1": "Gomez",
+    "last_name2": "Ruiz",
+    "email": "ana.gomez@example.com",
+    "phone": "3001234567",
+    "password": "Secreta1!",
+    "re_password": "Secreta1!",
+}
+INVALID = {**VALID, "email": "no-es-email", "phone": "12", "re_password": "otra"}
+
+
+def legacy_validate(data):
+    def match(pattern, value):
+        return isinstance(value, str) and re.match(pattern, value) is not None
+
+    def present(value):
+        return isinstance(value, str) and value.strip() != ""
+
+    errors = {}
+    if not (present(data.get("document")) and match(r"^[0-9]{6,15}$", data.get("document"))):
+        errors["document"] = "Invalid document format"
+    if not (present(data.get("document_type")) and data.get("document_type") in
+            {"CC", "TI", "CE", "PA", "RC", "NUIP", "PEP", "PPT", "NIT"}):
+        errors["document_type"] = "Invalid document type"
+    if not match(r"^[a-zA-Z]+$", data.get("name")):
+        errors["name"] = "Invalid name format"
+    if not match(r"^[a-zA-Z]+$", data.get("last_name1")) or not match(r"^[a-zA-Z]+$", data.get("last_name2")):
+        errors["last_names"] = "Invalid last names format"
+    if not (present(data.get("email")) and match(
+            r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})*$", data.get("email"))):
+        errors["email"] = "Invalid email format"
+    if not match(r"^[0-9]{7,15}$", str(data.get("phone"))):
+        errors["phone"] = "Invalid phone format"
+    if not (present(data.get("password")) and match(
+            r"^(?=.*[a-z])(?=.*[A-Z])(?=.*[0-9])(?=.*[@$!%*?&])[A-Za-z0-9@$!%*?&]{8,}$", data.get("password"))):
+        errors["password"] = "Invalid password format"
+    if not (isinstance(data.get("password"), str) and data.get("password") == data.get("re_password")):
+        errors["re_password"] = "Passwords do not match"
+    return errors
+
+
+def run(name, validate, payloads, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        validate(payloads[i & 1])
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {iterations / elapsed:>14.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    payloads = (VALID, INVALID)
+    validator = UserValidator(collection=None)
+    for payload in payloads:
+        assert legacy_validate(payload) == validator.validate(payload), payload
+
+    print(f"{'mode':<12} {'validations/s':>14}")
+    run("legacy", legacy_validate, payloads, args.iterations)
+    run("schema", CREATE_USER_SCHEMA.validate, payloads, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+
+# Configuracion de pruebas: sin indices al arrancar; rate limiting en memoria
+os.environ.setdefault("FLASK_ENV", "production")
+os.environ.setdefault("MONGO_ENSURE_INDEXES", "off")
+os.environ.setdefault("RATELIMIT_STORAGE_URI", "memory://")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-with-enough-length-32")
+
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app import create_app
+from app.decorators.auth_decorators import token_required
+from app.extensions import limiter
+from app.services import token_blocklist as token_blocklist_module
+from app.services import token_service
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for key, expected in query.items():
+        if key == "$or":
+            if not any(_matches(doc, clause) for clause in expected):
+                return False
+        elif isinstance(expected, dict) and "$gte" in expected:
+            if doc.get(key) is None or doc[key] < expected["$gte"]:
+                return False
+        elif isinstance(expected, dict) and "$in" in expected:
+            if doc.get(key) not in expected["$in"]:
+                return False
+        elif doc.get(key) != expected:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: dict = None) -> dict:
+    if not projection:
+        return dict(doc)
+    if not any(projection.values()):
+        return {key: value for key, value in doc.items() if key not in projection}
+    return {key: value for key, value in doc.items() if projection.get(key, key == "_id")}
+
+
+class FakeCursor(list):
+    def limit(self, count):
+        return FakeCursor(self[:count])
+
+
+class FakeCollection:
+    """
+    Coleccion en memoria con las operaciones que usan TokenService y TokenBlocklist
+    """
+
+    def __init__(self, docs=(), unique=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.unique = unique
+
+    def _check_unique(self, doc):
+        for field in self.unique:
+            if any(other[field] == doc.get(field) for other in self.docs.values()
+                   if other["_id"] != doc["_id"] and field in other):
+                raise DuplicateKeyError("duplicate key", 11000, {"keyPattern": {field: 1}})
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(_project(doc, projection) for doc in self.docs.values() if _matches(doc, query or {}))
+
+    def find_one(self, query, projection=None):
+        found = self.find(query, projection)
+        return found[0] if found else None
+
+    def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key", 11000, {"keyPattern": {"_id": 1}})
+        self._check_unique(doc)
+        self.docs[doc["_id"]] = dict(doc)
+
+    def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self.insert_one(doc)
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.find_one(query)
+        matched = doc is not None
+        if doc is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0)
+            doc = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        doc.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + amount
+        for key, push in update.get("$push", {}).items():
+            doc[key] = doc.get(key, []) + list(push["$each"])
+        self._check_unique(doc)
+        self.docs[doc["_id"]] = doc
+        return SimpleNamespace(matched_count=int(matched))
+
+    def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = self.find_one(query)
+        if doc is None:
+            if not upsert:
+                return None
+            doc = {"_id": query["_id"]}
+        for key, amount in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + amount
+        doc.update(update.get("$set", {}))
+        self.docs[doc["_id"]] = doc
+        return doc
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = create_app()
+
+    @app.route("/_protected")
+    @token_required
+    def protected():
+        return {"ok": True}
+
+    blocklist = token_blocklist_module.token_blocklist
+    monkeypatch.setattr(blocklist, "collection", FakeCollection())
+    monkeypatch.setattr(blocklist, "_jtis", {})
+    monkeypatch.setattr(blocklist, "_not_before", {})
+    monkeypatch.setattr(token_service, "families_collection", FakeCollection())
+    monkeypatch.setattr(
+        token_service,
+        "users_collection",
+        FakeCollection([{"_id": "u1", "role": "user"}, {"_id": "u2", "role": "admin"}]),
+    )
+    limiter.reset()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
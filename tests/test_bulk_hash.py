@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from app.auth import password_auth
+from app.auth.password_auth import PasswordHashBusyError, PasswordHashPool
+
+
+def test_bulk_hashes_verify_with_app_hasher():
+    passwords = ["uno", "dos", "tres"]
+    hashes = password_auth.hash_passwords_parallel(passwords)
+    assert all(password_auth.ph.verify(h, p) for h, p in zip(hashes, passwords))
+    assert not password_auth.needs_rehash(hashes[0])
+
+
+def test_bulk_map_shares_the_pool_and_leaves_the_queue_to_requests():
+    pool = PasswordHashPool(max_workers=2, max_queue=1, retry_after=1)
+    release = threading.Event()
+    peak = []
+
+    def work(item):
+        peak.append(pool._in_flight)
+        release.wait(5)
+        return item * 2
+
+    results = []
+    bulk = threading.Thread(target=lambda: results.extend(pool.map("bulk_hash", work, range(6))))
+    bulk.start()
+    while pool._in_flight < 2:
+        pass
+    # El lote ocupa los hilos, pero no la cola: una peticion aun puede encolarse
+    request = pool.submit("verify", lambda: "ok")
+    with pytest.raises(PasswordHashBusyError):
+        pool.submit("verify", lambda: "rechazada")
+    release.set()
+    bulk.join(5)
+
+    assert request.result(5) == "ok"
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert max(peak) <= 3
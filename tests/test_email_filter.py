@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.email_filter import EmailFilter
+from tests.conftest import FakeCollection
+
+
+class FakeVersion:
+    def __init__(self):
+        self.value = 0
+        self.reads = 0
+
+    def current(self):
+        self.reads += 1
+        return self.value
+
+    def bump(self):
+        self.value += 1
+        return self.value
+
+
+@pytest.fixture
+def users():
+    return FakeCollection([{"_id": "1", "email": "ana@example.com"}])
+
+
+@pytest.fixture
+def email_filter(users, monkeypatch):
+    email_filter = EmailFilter(users, FakeVersion(), error_rate=0.001, refresh_seconds=3600, rebuild_seconds=0)
+    # Sin hilos: el sondeo y las reconstrucciones se lanzan a mano en cada prueba
+    monkeypatch.setattr(email_filter, "_ensure_polling", lambda: None)
+    monkeypatch.setattr(email_filter, "_rebuild_async", email_filter._rebuild)
+    email_filter._rebuild()
+    return email_filter
+
+
+def test_lookups_only_touch_memory(email_filter):
+    reads = email_filter.version.reads
+    assert email_filter.might_contain("ana@example.com")
+    assert not email_filter.might_contain("nadie@example.com")
+    assert email_filter.version.reads == reads
+
+
+def test_signup_in_other_worker_is_seen_after_poll(email_filter, users, monkeypatch):
+    # Alta hecha por otro worker: este filtro no recibio add()
+    users.insert_one({"_id": "2", "email": "luis@example.com"})
+    email_filter.version.bump()
+
+    monkeypatch.setattr(email_filter, "_rebuild_async", lambda: None)
+    email_filter.poll()
+    # Version nueva sin reconstruir: los ausentes se consultan en MongoDB
+    assert email_filter.might_contain("luis@example.com")
+    assert email_filter.might_contain("nadie@example.com")
+
+    email_filter._rebuild()
+    assert email_filter.might_contain("luis@example.com")
+    assert not email_filter.might_contain("nadie@example.com")
+
+
+def test_local_add_does_not_invalidate_the_filter(email_filter, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(email_filter, "_rebuild_async", lambda: rebuilds.append(1))
+    email_filter.add("luis@example.com", "eva@example.com")
+    email_filter.poll()
+
+    assert email_filter.version.value == 1
+    assert rebuilds == []
+    assert email_filter.might_contain("eva@example.com")
+    assert not email_filter.might_contain("nadie@example.com")
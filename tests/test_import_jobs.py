@@ -0,0 +1,64 @@
+import pytest
+
+from app.services import import_job_service, user_service
+from app.utils.collection_version import CollectionVersion
+from tests.conftest import FakeCollection
+
+ROWS = [
+    {"document": "100100", "document_type": "CC", "role": "user", "name": "Ana", "last_name1": "Diaz",
+     "last_name2": "Ruiz", "email": "ana@example.com", "phone": "3001234567", "password": "Secreta123*", "re_password": "Secreta123*"},
+    {"document": "100200", "document_type": "CC", "role": "admin", "name": "Luis", "last_name1": "Mora",
+     "last_name2": "Gil", "email": "luis@example.com", "phone": "3007654321", "password": "Secreta123*", "re_password": "Secreta123*"},
+]
+
+
+def _wait_for_jobs():
+    # El runner tiene un solo hilo: esto espera a que terminen las importaciones encoladas
+    import_job_service._import_runner().submit(lambda: None).result(30)
+
+
+@pytest.fixture
+def import_env(app, monkeypatch):
+    counters = FakeCollection()
+    monkeypatch.setattr(import_job_service, "import_jobs_collection", FakeCollection())
+    monkeypatch.setattr(user_service, "users_collection", FakeCollection(unique=("email",)))
+    monkeypatch.setattr(user_service, "users_version", CollectionVersion(counters, "users"))
+    monkeypatch.setattr(user_service.email_filter, "version", CollectionVersion(counters, "user_emails"))
+    return app
+
+
+def _headers(app, user_id="u2", role="admin"):
+    from app.auth.jwt_auth import generate_token
+    with app.app_context():
+        return {"Authorization": f"Bearer {generate_token(user_id, role)}"}
+
+
+def test_import_runs_in_background_and_reports_progress(import_env, client):
+    headers = _headers(import_env)
+    response = client.post("/users/bulk", json=ROWS, headers=headers)
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    _wait_for_jobs()
+    job = client.get(f"/users/bulk/{job_id}", headers=headers).get_json()
+    assert job["status"] == "done"
+    assert (job["total"], job["processed"], job["created"], job["failed"]) == (2, 2, 1, 1)
+    assert [result["status"] for result in job["results"]] == ["created", "error"]
+    assert "100100" in user_service.users_collection.docs
+
+
+def test_import_job_is_private_to_its_creator(import_env, client):
+    job_id = client.post("/users/bulk", json=ROWS[:1], headers=_headers(import_env)).get_json()["job_id"]
+    _wait_for_jobs()
+
+    other = client.get(f"/users/bulk/{job_id}", headers=_headers(import_env, user_id="u3"))
+    master = client.get(f"/users/bulk/{job_id}", headers=_headers(import_env, user_id="u9", role="master"))
+    assert other.status_code == 404
+    assert master.status_code == 200
+
+
+def test_import_over_row_limit_is_rejected_upfront(import_env, client, monkeypatch):
+    monkeypatch.setattr(import_job_service.Config, "BULK_IMPORT_MAX_ROWS", 1)
+    response = client.post("/users/bulk", json=ROWS, headers=_headers(import_env))
+    assert response.status_code == 413
+    assert import_job_service.import_jobs_collection.docs == {}
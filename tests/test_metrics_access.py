@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def metrics_app(app):
+    app.config["METRICS_ALLOWED_IPS"] = ["127.0.0.1/32", "10.0.0.0/8"]
+    app.config["METRICS_TOKEN"] = "scrape-token"
+    return app
+
+
+def _get(app, remote_addr, headers=None):
+    return app.test_client().get("/metrics", headers=headers, environ_base={"REMOTE_ADDR": remote_addr})
+
+
+@pytest.mark.parametrize("remote_addr", ["127.0.0.1", "10.1.2.3", "::ffff:10.1.2.3"])
+def test_allowed_networks_can_scrape(metrics_app, remote_addr):
+    response = _get(metrics_app, remote_addr)
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+
+
+def test_public_address_is_rejected(metrics_app):
+    assert _get(metrics_app, "203.0.113.7").status_code == 403
+
+
+def test_token_grants_access_from_any_address(metrics_app):
+    ok = _get(metrics_app, "203.0.113.7", {"Authorization": "Bearer scrape-token"})
+    wrong = _get(metrics_app, "203.0.113.7", {"Authorization": "Bearer other"})
+    assert ok.status_code == 200
+    assert wrong.status_code == 403
+
+
+def test_no_token_configured_ignores_authorization(metrics_app):
+    metrics_app.config["METRICS_TOKEN"] = None
+    response = _get(metrics_app, "203.0.113.7", {"Authorization": "Bearer None"})
+    assert response.status_code == 403
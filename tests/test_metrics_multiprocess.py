@@ -0,0 +1,61 @@
+import json
+import os
+
+from app.utils.metrics import MetricsRegistry
+
+DEAD_PID = 999999999
+
+
+def _registry(tmp_path):
+    registry = MetricsRegistry()
+    registry.enable_multiprocess(str(tmp_path))
+    requests = registry.counter("requests_total", "Peticiones", labelnames=("status",))
+    latency = registry.histogram("latency_seconds", "Latencia", buckets=(0.1, 1.0))
+    in_flight = registry.gauge("in_flight", "En curso")
+    ratio = registry.gauge("hit_ratio", "Aciertos", multiprocess_mode="liveall")
+    return registry, requests, latency, in_flight, ratio
+
+
+def _write_worker(tmp_path, pid, data):
+    (tmp_path / f"{pid}.json").write_text(json.dumps(data))
+
+
+def test_render_aggregates_all_workers(tmp_path):
+    registry, requests, latency, in_flight, ratio = _registry(tmp_path)
+    requests.inc(2, "200")
+    latency.observe(0.05)
+    in_flight.set(1)
+    ratio.set(0.5)
+    other = {
+        "requests_total": [[["200"], 3], [["503"], 1]],
+        "latency_seconds": [[[], [0, 1, 0, 0.5]]],
+        "in_flight": [[[], 4]],
+        "hit_ratio": [[[], 0.9]],
+    }
+    _write_worker(tmp_path, os.getppid(), other)
+
+    text = registry.render()
+    assert 'requests_total{status="200"} 5' in text
+    assert 'requests_total{status="503"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_count 2' in text
+    assert "in_flight 5" in text
+    assert f'hit_ratio{{pid="{os.getpid()}"}} 0.5' in text
+    assert f'hit_ratio{{pid="{os.getppid()}"}} 0.9' in text
+
+
+def test_dead_workers_keep_counters_but_not_gauges(tmp_path):
+    registry, requests, _, in_flight, _ = _registry(tmp_path)
+    in_flight.set(0)
+    _write_worker(tmp_path, DEAD_PID, {"requests_total": [[["200"], 7]], "in_flight": [[[], 3]]})
+
+    text = registry.render()
+    assert 'requests_total{status="200"} 7' in text
+    assert "in_flight 0" in text
+
+
+def test_without_directory_metrics_are_per_process(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Peticiones").inc(1)
+    assert "requests_total 1" in registry.render()
+    assert list(tmp_path.iterdir()) == []
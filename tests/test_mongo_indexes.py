@@ -0,0 +1,28 @@
+from app.config import mongo_indexes
+
+
+class _IndexCollection:
+    def __init__(self, name, created, failing):
+        self.name, self.created, self.failing = name, created, failing
+
+    def create_index(self, keys, name, **options):
+        if f"{self.name}.{name}" in self.failing:
+            raise RuntimeError("index build failed")
+        self.created.append(f"{self.name}.{name}")
+
+
+class _IndexDatabase:
+    def __init__(self, created, failing):
+        self.created, self.failing = created, failing
+
+    def __getitem__(self, name):
+        return _IndexCollection(name, self.created, self.failing)
+
+
+def test_failed_index_does_not_stop_the_others(monkeypatch):
+    created = []
+    failing = {"users.email_1"}
+    monkeypatch.setattr(mongo_indexes, "db", _IndexDatabase(created, failing))
+
+    assert mongo_indexes.ensure_indexes() == ["users.email_1"]
+    assert len(created) == len(mongo_indexes.INDEXES) - 1
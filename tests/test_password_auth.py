@@ -0,0 +1,20 @@
+import asyncio
+
+from app import create_app
+from app.auth import password_auth
+
+
+def test_create_app_does_not_compute_the_dummy_hash(monkeypatch):
+    monkeypatch.setattr(password_auth, "_dummy", None)
+    create_app()
+    assert password_auth._dummy is None
+
+
+def test_dummy_hash_is_computed_once_in_the_pool(monkeypatch):
+    monkeypatch.setattr(password_auth, "_dummy", None)
+    assert password_auth.verify_dummy("secreto") is False
+    first = password_auth._dummy
+    assert first.done() and not password_auth.needs_rehash(first.result())
+
+    assert asyncio.run(password_auth.verify_dummy_async("otro")) is False
+    assert password_auth._dummy is first
@@ -0,0 +1,50 @@
+import itertools
+
+import pytest
+
+from app.config.app_config import DEFAULT_ROLE_POLICY
+from app.utils.permission_utils import RolePermissions, RolePolicy
+from benchmarks.bench_permissions import CHECKS, LegacyRolePermissions
+
+ROLES = ["master", "admin", "user", "guest", "", None]
+
+
+@pytest.mark.parametrize("check", CHECKS)
+@pytest.mark.parametrize("current_role,target_role", list(itertools.product(ROLES, ROLES)))
+def test_compiled_policy_matches_legacy_if_chains(check, current_role, target_role):
+    legacy = getattr(LegacyRolePermissions, check)(current_role, target_role)
+    assert getattr(RolePermissions, check)(current_role, target_role) is legacy
+
+
+@pytest.mark.parametrize("role", ROLES)
+def test_visible_roles_match_legacy(role):
+    assert RolePermissions.visible_roles(role) == LegacyRolePermissions.visible_roles(role)
+
+
+@pytest.mark.parametrize("check", CHECKS)
+def test_unhashable_roles_are_denied(check):
+    assert getattr(RolePermissions, check)(["master"], "admin") is False
+    assert getattr(RolePermissions, check)("master", {"role": "admin"}) is False
+
+
+def test_allows_matches_checker():
+    policy = RolePolicy(DEFAULT_ROLE_POLICY)
+    for action in DEFAULT_ROLE_POLICY:
+        check = policy.checker(action)
+        for current_role, target_role in itertools.product(ROLES, ROLES):
+            assert policy.allows(action, current_role, target_role) is check(current_role, target_role)
+    assert not policy.allows("unknown", "master", "admin")
+
+
+def test_custom_policy():
+    policy = RolePolicy({"delete": {"owner": ["owner", "member"]}, "view": {"member": ["member"]}})
+    delete = policy.checker("delete")
+    assert delete("owner", "member")
+    assert not delete("member", "owner")
+    assert not policy.checker("update")("owner", "owner")
+    assert policy.targets("view", "member") == ("member",)
+
+
+def test_visibility_filter():
+    assert RolePermissions.visibility_filter("master") == {"role": "admin"}
+    assert RolePermissions.visibility_filter("guest") is None
@@ -0,0 +1,31 @@
+import base64
+import io
+
+from PIL import Image
+
+
+def _headers(app, user_id="u1", role="user"):
+    from app.auth.jwt_auth import generate_token
+    with app.app_context():
+        return {"Authorization": f"Bearer {generate_token(user_id, role)}"}
+
+
+def _modules(token: str, border: int) -> int:
+    from app.utils.qr_utils import build_matrix
+    return len(build_matrix(token, border=border))
+
+
+def test_raw_png_is_one_pixel_per_module(app, client):
+    response = client.get("/qr/generate-qr?raw=1", headers=_headers(app))
+    assert response.status_code == 200
+    image = Image.open(io.BytesIO(response.data))
+    modules = _modules(response.headers["X-QR-Token"], app.config["QR_BORDER"])
+    assert image.size == (modules * app.config["QR_RAW_BOX_SIZE"],) * 2
+    assert image.mode == "1"
+
+
+def test_base64_png_keeps_box_size(app, client):
+    data = client.get("/qr/generate-qr", headers=_headers(app)).get_json()
+    image = Image.open(io.BytesIO(base64.b64decode(data["qr_token"])))
+    modules = _modules(data["token"], app.config["QR_BORDER"])
+    assert image.size == (modules * app.config["QR_BOX_SIZE"],) * 2
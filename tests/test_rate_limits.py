@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def limited_app(app):
+    app.config["QR_RATE_LIMIT_DEVICE"] = "2/minute"
+    app.config["QR_RATE_LIMIT_IP"] = "3/minute"
+    return app
+
+
+def _validate(client, device_id):
+    return client.post("/qr/validate", json={}, headers={"X-Device-Id": device_id})
+
+
+def test_qr_limit_per_device(limited_app):
+    client = limited_app.test_client()
+    statuses = [_validate(client, "reader-1").status_code for _ in range(3)]
+    assert statuses[-1] == 429
+    assert 429 not in statuses[:-1]
+
+
+def test_rotating_device_id_still_hits_ip_limit(limited_app):
+    client = limited_app.test_client()
+    statuses = [_validate(client, f"reader-{i}").status_code for i in range(4)]
+    assert statuses[-1] == 429
+    assert 429 not in statuses[:-1]
+
+
+@pytest.fixture
+def proxied_app(monkeypatch, request):
+    from app.config.app_config import ProductionConfig
+    monkeypatch.setattr(ProductionConfig, "PROXY_FIX_X_FOR", 1)
+    app = request.getfixturevalue("app")
+    app.config["QR_RATE_LIMIT_DEVICE"] = "2/minute"
+    app.config["QR_RATE_LIMIT_IP"] = "3/minute"
+    return app
+
+
+def _validate_via_proxy(client, device_id, client_ip):
+    return client.post("/qr/validate", json={}, headers={"X-Device-Id": device_id, "X-Forwarded-For": client_ip},
+                       environ_base={"REMOTE_ADDR": "10.0.0.2"})
+
+
+def test_behind_proxy_ip_limit_is_per_client(proxied_app):
+    client = proxied_app.test_client()
+    statuses = [_validate_via_proxy(client, f"reader-{i}", f"203.0.113.{i}").status_code for i in range(6)]
+    assert 429 not in statuses
+
+
+def test_behind_proxy_client_still_hits_ip_limit(proxied_app):
+    client = proxied_app.test_client()
+    statuses = [_validate_via_proxy(client, f"reader-{i}", "203.0.113.7").status_code for i in range(4)]
+    assert statuses[-1] == 429
+
+
+def test_forwarded_header_ignored_without_proxy_fix(limited_app):
+    client = limited_app.test_client()
+    statuses = [_validate_via_proxy(client, f"reader-{i}", f"203.0.113.{i}").status_code for i in range(4)]
+    assert statuses[-1] == 429
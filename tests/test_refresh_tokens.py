@@ -0,0 +1,60 @@
+from flask_jwt_extended import decode_token
+
+from app.services import token_service
+from app.services.token_service import TokenService
+
+
+def _refresh(client, refresh_token):
+    return client.post("/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+
+def _issue(app, user_id="u1", role="user"):
+    with app.app_context():
+        return TokenService.issue_tokens(user_id, role)
+
+
+def test_refresh_rotates_to_next_generation(app, client):
+    tokens = _issue(app)
+
+    first = _refresh(client, tokens["refresh_token"])
+    assert first.status_code == 200
+    second = _refresh(client, first.get_json()["refresh_token"])
+    assert second.status_code == 200
+
+    with app.app_context():
+        claims = decode_token(second.get_json()["refresh_token"])
+    assert claims["gen"] == 2
+    assert token_service.families_collection.docs[claims["fam"]]["gen"] == 2
+
+
+def test_refresh_reads_current_role(app, client):
+    tokens = _issue(app, role="admin")
+    token_service.users_collection.docs["u1"]["role"] = "user"
+
+    response = _refresh(client, tokens["refresh_token"])
+    with app.app_context():
+        claims = decode_token(response.get_json()["access_token"])
+    assert claims["role"] == "user"
+
+
+def test_reusing_a_rotated_token_revokes_the_family(app, client):
+    tokens = _issue(app)
+    rotated = _refresh(client, tokens["refresh_token"]).get_json()["refresh_token"]
+
+    reuse = _refresh(client, tokens["refresh_token"])
+    assert reuse.status_code == 401
+    assert reuse.get_json()["error"] == "Refresh token reuse detected"
+    # La generacion vigente tambien queda invalidada
+    assert _refresh(client, rotated).status_code == 401
+
+
+def test_refresh_for_deleted_user_is_rejected(app, client):
+    tokens = _issue(app)
+    del token_service.users_collection.docs["u1"]
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_access_token_cannot_refresh(app, client):
+    tokens = _issue(app)
+    assert _refresh(client, tokens["access_token"]).status_code == 422
@@ -0,0 +1,30 @@
+import pytest
+from click.testing import CliRunner
+
+from app.commands.replay_commands import replay_guard_server
+from app.config.app_config import Config
+from app.utils.replay_guard import ManagerReplayStore, create_replay_store
+
+
+def test_manager_backend_requires_authkey():
+    with pytest.raises(ValueError):
+        create_replay_store("manager", "127.0.0.1:50055", None)
+    with pytest.raises(ValueError):
+        create_replay_store("manager", "127.0.0.1:50055", "")
+
+
+def test_manager_backend_with_authkey():
+    store = create_replay_store("manager", "127.0.0.1:50055", "s3cret")
+    assert isinstance(store, ManagerReplayStore)
+    assert store.authkey == b"s3cret"
+
+
+def test_memory_backend_needs_no_authkey():
+    assert create_replay_store("memory", "127.0.0.1:50055", None).check_and_set("jti", 0)
+
+
+def test_server_refuses_to_start_without_authkey(monkeypatch):
+    monkeypatch.setattr(Config, "QR_REPLAY_AUTHKEY", None)
+    result = CliRunner().invoke(replay_guard_server, [])
+    assert result.exit_code != 0
+    assert "QR_REPLAY_AUTHKEY" in result.output
@@ -0,0 +1,51 @@
+import time
+
+from app.auth.jwt_auth import generate_token
+from app.services.token_blocklist import token_blocklist
+
+
+def _get(client, token):
+    return client.get("/_protected", headers={"Authorization": f"Bearer {token}"})
+
+
+def test_token_issued_before_user_revocation_is_rejected(app, client):
+    with app.app_context():
+        token = generate_token("u1", "user")
+        token_blocklist.revoke_user("u1")
+
+    assert _get(client, token).status_code == 401
+
+
+def test_login_right_after_promotion_is_accepted(app, client):
+    # Cambio de rol y nuevo login dentro del mismo segundo; la misma milesima
+    # se trata como anterior a la revocacion
+    with app.app_context():
+        old_token = generate_token("u1", "user")
+        token_blocklist.revoke_user("u1")
+        time.sleep(0.002)
+        new_token = generate_token("u1", "admin")
+
+    assert _get(client, old_token).status_code == 401
+    assert _get(client, new_token).status_code == 200
+
+
+def test_logout_revokes_only_that_access_token(app, client):
+    with app.app_context():
+        first = generate_token("u1", "user")
+        second = generate_token("u1", "user")
+
+    response = client.post("/auth/logout", headers={"Authorization": f"Bearer {first}"})
+    assert response.status_code == 200
+    assert _get(client, first).status_code == 401
+    assert _get(client, second).status_code == 200
+
+
+def test_revocations_from_other_workers_are_synced(app):
+    with app.app_context():
+        token_blocklist.revoke_user("u1")
+        claims = {"sub": "u1", "iat_ms": 0}
+        # Otro worker: memoria vacia, mismo almacen compartido
+        token_blocklist._not_before.clear()
+        assert not token_blocklist.is_revoked(claims)
+        token_blocklist.sync()
+        assert token_blocklist.is_revoked(claims)
@@ -0,0 +1,43 @@
+from app.validators.user_validator import UserValidator
+from tests.conftest import FakeCollection
+
+
+def _validator():
+    return UserValidator(FakeCollection([
+        {"_id": "100", "email": "ana@example.com"},
+        {"_id": "200", "email": "luis@example.com"},
+    ]))
+
+
+def test_same_user_matching_document_and_email_reports_both():
+    conflicts = _validator().find_conflicts(100, "ana@example.com")
+    assert set(conflicts) == {"document", "email"}
+
+
+def test_conflicts_in_different_users():
+    conflicts = _validator().find_conflicts(100, "luis@example.com")
+    assert set(conflicts) == {"document", "email"}
+
+
+def test_no_conflicts():
+    assert _validator().find_conflicts(300, "nuevo@example.com") == {}
+
+
+def test_update_to_registered_email_is_a_conflict(monkeypatch):
+    from app.auth.identity import Identity
+    from app.services import user_service
+
+    users = FakeCollection(
+        [{"_id": "100", "email": "ana@example.com", "role": "user"},
+         {"_id": "200", "email": "luis@example.com", "role": "user"}],
+        unique=("email",),
+    )
+    monkeypatch.setattr(user_service, "users_collection", users)
+    monkeypatch.setattr(user_service.user_cache, "get", lambda user_id: users.find_one({"_id": str(user_id)}))
+
+    response, status = user_service.UserService.update_user(
+        Identity.system(role="admin"), "100", {"email": "luis@example.com"}
+    )
+    assert status == 409
+    assert response == {"error": {"email": "Email already registered"}}
+    assert users.docs["100"]["email"] == "ana@example.com"
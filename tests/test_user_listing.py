@@ -0,0 +1,25 @@
+import pytest
+
+from app.services import user_service
+from app.utils.collection_version import CollectionVersion
+from tests.conftest import FakeCollection
+
+USERS = [
+    {"_id": "100100", "role": "user", "email": "ana@example.com", "password": "$argon2id$hash-ana"},
+    {"_id": "100200", "role": "admin", "email": "luis@example.com", "password": "$argon2id$hash-luis"},
+]
+
+
+@pytest.fixture
+def listing_env(app, monkeypatch):
+    monkeypatch.setattr(user_service, "listing_collection", FakeCollection(USERS))
+    monkeypatch.setattr(user_service, "users_version", CollectionVersion(FakeCollection(), "users"))
+    return app
+
+
+def test_all_users_never_returns_password_hashes(listing_env, client):
+    response = client.get("/users/all-users")
+    assert response.status_code == 200
+    users = response.get_json()
+    assert {user["id"] for user in users} == {"100100", "100200"}
+    assert all("password" not in user for user in users)